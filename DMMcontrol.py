@@ -0,0 +1,84 @@
+import tkinter as tk
+from keithleyDMM6500 import DMM6500
+
+MEASUREMENTS = {
+    "Voltage": ("read_voltage", "voltage"),
+    "Resistance": ("read_resistance", "resistance"),
+    "Continuity": ("read_continuity", "continuity"),
+    # "Current": ("read_current", "current"),  # Add if supported
+}
+
+class DMMControlPanel:
+    def __init__(self, parent, dmm: DMM6500, scheduler, render, store=None, rates=(0.5, 2.0), active_fn=None):
+        self.dmm = dmm
+        self.scheduler = scheduler  # shared PollScheduler running the live reads
+        self.render = render  # RenderScheduler; the reading label only changes through it
+        self.store = store  # optional TimeSeriesStore that keeps every reading
+        self.rates = rates  # (active, idle) poll intervals
+        self.active_fn = active_fn  # e.g. "the DUT is powered"
+        self.busy = False  # set while a capture or sweep owns the DMM
+        self.mode = "Voltage"  # plain copy of measure_mode for the poll thread
+        self.poller = None
+        self.frame = tk.LabelFrame(parent, text=dmm.name, padx=10, pady=10)
+
+        self.measure_mode = tk.StringVar(value=self.mode)
+
+        row = 1
+        tk.Label(self.frame, text="Keithley DMM6500 Readings", font=("Arial", 10, "bold")).grid(row=row, column=0, pady=(10, 0), sticky="ns", padx=5)
+        row += 2
+        tk.Label(self.frame, text="Measure:").grid(row=row, column=0, sticky="ns", padx=5, pady=5)
+        tk.OptionMenu(self.frame, self.measure_mode, *MEASUREMENTS, command=self.set_mode).grid(row=row, column=1, sticky="nsew", padx=5, pady=5)
+        row += 1
+        self.measurement_label = tk.Label(self.frame, text="--", font=("Arial", 12))
+        self.measurement_label.grid(row=row, column=0, pady=(5, 0), sticky="ns", padx=5)
+
+    def set_mode(self, mode):
+        self.mode = mode
+        if self.poller is not None:
+            self.poller.drain()  # drop readings taken in the previous mode
+
+    def start_polling(self):
+        self.stop_polling()
+        active, idle = self.rates
+        self.poller = self.scheduler.add(self.dmm.name, self.read_live_value, active, idle, self.active_fn)
+
+    def stop_polling(self):
+        if self.poller is not None:
+            self.poller.stop()
+            self.poller = None
+
+    def read_live_value(self):
+        # Runs on a poll scheduler thread, never touch widgets here.
+        if self.busy:
+            return None
+        mode = self.mode
+        return mode, getattr(self.dmm, MEASUREMENTS[mode][0])()
+
+    def update_live_readings(self):
+        if self.poller is None:
+            return
+        items = self.poller.drain()
+        if not items:
+            return
+        for timestamp, reading, error in items:
+            if error is None and self.store is not None:
+                mode, val = reading
+                self.store.record(self.dmm.name, None, MEASUREMENTS[mode][1], val, timestamp)
+        _, reading, error = items[-1]
+        if error is not None:
+            # Shown in place of the reading; the failed command is counted in STATS by the driver.
+            self.render.set_text(self.measurement_label, f"Error: {error}", fg="red")
+            return
+        mode, val = reading
+        fg = "black"
+        if mode == "Voltage":
+            text = f"{val:.5f} V"
+        elif mode == "Current":
+            text = f"{val:.6f} A"
+        elif mode == "Resistance":
+            text = f"{val:.2f} Ω"
+        elif val < 10:  # Continuity
+            text, fg = f"Closed ({val:.2f} Ω)", "green"
+        else:
+            text, fg = f"Open ({val:.2f} Ω)", "red"
+        self.render.set_text(self.measurement_label, text, fg=fg)
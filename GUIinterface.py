@@ -1,204 +1,272 @@
 import tkinter as tk
-from tkinter import messagebox
-from keithleyDMM6500 import DMM6500
+from tkinter import messagebox, ttk
+import time
+import numpy as np
 from PSUcontrol import PSUControlPanel
-from chroma_load import ChromaLoad
-from SerialConnection import Stk500Controller,  ComplexSdfProvider
+from DMMcontrol import DMMControlPanel
+from LoadControl import LoadControlPanel
+from acquisition import PollScheduler
+from load_profiles import load_profiles
+from timeseries import TimeSeriesStore
+from measurement_log import MeasurementLogger
+from instrumentation import STATS
+from stats_panel import StatsPanel
+from sweep import SweepEngine, save_result
+from log_console import LogConsole
+from render import RenderScheduler
+import os
+import queue
 import threading
 
-MODES = ["CCL", "CCH", "CCDL", "CCDH", "CRL", "CRH", "CV"]
-
 class GUI:
-    def __init__(self, root, psus: dict, dmm_ip: str = None):
+    def __init__(self, root, registry, log_dir: str = "measurements"):
         self.root = root
-        self.psus = psus  # {"PSU 1": CPX400DP, "PSU 2": CPX400DP}
-        self.chroma = ChromaLoad(ip="192.168.0.10", port=5000)
+        self.registry = registry  # InstrumentRegistry built from the bench config
+        self.psus = registry.psus  # {"PSU Left": CPX400DP, ...}
+        self.scheduler = PollScheduler(**registry.scheduler_options())  # runs every live read
         self.stk500 = None
+        self.store = TimeSeriesStore()  # history of every live reading
+        self.measurement_log = MeasurementLogger(log_dir)  # everything read is persisted here
+        self.stats_path = os.path.join(log_dir, "instrument_stats.json")
+        self.log_dir = log_dir
+        self.sweep = None
+        self.next_cell = 0  # panels are laid out left to right, registry.columns per row
 
         self.root.title("Service tools for PCBA")
         self.root.resizable(True, True)
+        self.render = RenderScheduler(root, registry.config.get("fps", 10))  # the only UI refresh loop
 
-        self.build_psu_panels()   
-        self.build_dmm_section(dmm_ip)
-        self.build_chroma_section()
+        self.build_psu_panels()
+        self.build_dmm_panels()
+        self.build_sweep_section()
+        self.build_load_panels()
         self.build_stk500_section()
-     
-        self.update_live_readings()
-        self.monitor_load()
-
-    def build_psu_panels(self):
-        self.psu_panels = []
-        for i, (name, psu) in enumerate(self.psus.items()):
-            panel = PSUControlPanel(self.root, psu)
-            panel.frame.grid(row=0, column=i, padx=10, pady=10, sticky="nsew")
-            self.psu_panels.append(panel)
-
-        for i in range(len(self.psus)):
-            self.root.columnconfigure(i, weight=1)
-        self.root.rowconfigure(0, weight=1)
+        self.attach_recorder()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.build_menu()
 
+        self.render.add(self.update_live_readings)
+        self.root.after(10000, self.dump_stats)
+        self.connect_instruments()
 
-    def build_dmm_section(self, dmm_ip):
-        # DMM controls under PSU panels
-        self.dmm = None
-        self.dmm_measure_mode = tk.StringVar(value="Voltage")
-        self.dmm_measurement_var = tk.StringVar(value="--")
+    def connect_instruments(self):
+        # The window is already up: DMMs and loads connect in parallel off the Tk thread
+        # and their panels start polling once the attempt is over.
+        self.connections = queue.Queue()
+        started = time.perf_counter()
 
-        dmm_frame = tk.Frame(self.root)
-        dmm_frame.grid(row=1, column=0, columnspan= 1, padx=10, pady=10, sticky="nsew")
+        def task():
+            errors = self.registry.connect_all()
+            self.connections.put((errors, time.perf_counter() - started))
+        threading.Thread(target=task, name="connect", daemon=True).start()
+        self.render.add(self.check_connections)
 
-        if dmm_ip:
-            try:
-                self.dmm = DMM6500(dmm_ip)
-                row = 1
-                tk.Label(dmm_frame, text="Keithley DMM6500 Readings", font=("Arial", 10, "bold")).grid(row=row, column=0, pady=(10, 0), sticky="ns", padx=5)
-                row += 2
-                tk.Label(dmm_frame, text="Measure:").grid(row=row, column=0, sticky="ns", padx=5, pady=5)
-                measure_options = ["Voltage", "Resistance", "Continuity"]  # Add Current if supported
-                tk.OptionMenu(dmm_frame, self.dmm_measure_mode, *measure_options).grid(row=row, column=1, sticky="nsew", padx=5, pady=5)
-                row += 1
-                self.dmm_measurement_label = tk.Label(dmm_frame, textvariable=self.dmm_measurement_var, font=("Arial", 12))
-                self.dmm_measurement_label.grid(row=row, column=0, pady=(5, 0), sticky="ns", padx=5)
-                self.root.after(1000, self.update_dmm_readings)
-            except Exception as e:
-                messagebox.showerror("DMM Connection Error", f"Failed to connect to DMM: {e}")
+    def check_connections(self):
+        try:
+            errors, elapsed = self.connections.get_nowait()
+        except queue.Empty:
+            return
+        self.render.remove(self.check_connections)
+        print(f"Instruments connected in {elapsed:.2f} s")
+        # Instruments that failed to connect are polled too: the poll scheduler backs off
+        # and opens their breaker, and reconnects them once they come back.
+        for panel in self.dmm_panels + self.load_panels:
+            panel.start_polling()
+        for name, error in errors.items():
+            messagebox.showerror("Connection Error", f"Failed to connect to {name}: {error}")
+
+    def place(self, frame):
+        row, column = divmod(self.next_cell, self.registry.columns)
+        frame.grid(row=row, column=column, padx=10, pady=10, sticky="nsew")
+        self.root.columnconfigure(column, weight=1)
+        self.root.rowconfigure(row, weight=1)
+        self.next_cell += 1
+
+    def place_full_width(self, frame):
+        row = -(-self.next_cell // self.registry.columns)  # first empty row
+        frame.grid(row=row, column=0, columnspan=self.registry.columns, padx=10, pady=10, sticky="nsew")
+        self.next_cell = (row + 1) * self.registry.columns
+
+    def attach_recorder(self):
+        for kind in self.registry.instruments.values():
+            for instrument in kind.values():
+                instrument.recorder = self.measurement_log
+
+    def build_menu(self):
+        menubar = tk.Menu(self.root)
+        tools = tk.Menu(menubar, tearoff=0)
+        tools.add_command(label="Instrument Stats", command=lambda: StatsPanel(self.root))
+        menubar.add_cascade(label="Tools", menu=tools)
+        self.root.config(menu=menubar)
+
+    def dump_stats(self):
+        try:
+            STATS.dump(self.stats_path)
+        except OSError as e:
+            print(f"Could not write instrument stats: {e}")
+        self.root.after(10000, self.dump_stats)
+
+    def on_close(self):
+        if self.sweep:
+            self.sweep.cancel()
+        for panel in self.psu_panels + self.dmm_panels + self.load_panels:
+            panel.stop_polling()
+        self.stop_stk_telemetry()
+        self.scheduler.shutdown()
+        self.measurement_log.close()
+        STATS.dump(self.stats_path)
+        self.root.destroy()
 
+    def build_psu_panels(self):
+        self.psu_panels = []
+        for psu in self.psus.values():
+            panel = PSUControlPanel(self.root, psu, self.scheduler, self.render, store=self.store,
+                                    rates=self.registry.poll_rates(psu.name, "readings"))
+            self.place(panel.frame)
+            self.psu_panels.append(panel)
 
-        # Configure columns and rows for DMM
+    def build_dmm_panels(self):
+        # DMM controls next to the PSU panels; DMMs are polled as soon as they connect.
+        self.dmm_panels = []
+        for dmm in self.registry.dmms.values():
+            panel = DMMControlPanel(self.root, dmm, self.scheduler, self.render, store=self.store,
+                                    rates=self.registry.poll_rates(dmm.name, "measurement"),
+                                    active_fn=self.bench_active)
+            self.place(panel.frame)
+            self.dmm_panels.append(panel)
+
+    def build_load_panels(self):
+        try:
+            profiles = load_profiles()
+        except Exception as e:
+            profiles = []
+            messagebox.showerror("Load Profile Error", f"Failed to read load profiles: {e}")
+        # Transient captures use the first DMM of the bench.
+        dmm_panel = self.dmm_panels[0] if self.dmm_panels else None
+        self.load_panels = []
+        for chroma in self.registry.loads.values():
+            panel = LoadControlPanel(self.root, chroma, self.scheduler, self.render, store=self.store,
+                                     profiles=profiles, dmm_panel=dmm_panel,
+                                     log_file=os.path.join(self.log_dir, f"{chroma.name}.log"),
+                                     rates=self.registry.poll_rates(chroma.name, "state"))
+            self.place(panel.frame)
+            self.load_panels.append(panel)
+
+    def bench_active(self):
+        # True while any PSU output or load is on; the DMMs poll faster then.
+        return (any(psu.output_enabled() for psu in self.psus.values())
+                or any(panel.load_on for panel in self.load_panels))
 
     def update_live_readings(self):
-        for panel in self.psu_panels:
+        # Render source: only picks up what the poll scheduler published; no instrument I/O on the Tk thread.
+        for panel in self.psu_panels + self.dmm_panels + self.load_panels:
             panel.update_live_readings()
-        self.root.after(500, self.update_live_readings)  # update every 2 seconds
-
-    def update_dmm_readings(self):
-        if self.dmm:        
-            try:
-                mode = self.dmm_measure_mode.get()
-                self.dmm_measurement_label.config(fg="black")
-                if mode == "Voltage":
-                    val = self.dmm.read_voltage()
-                    self.dmm_measurement_var.set(f"{val:.5f} V")
-        #                elif mode == "Current":  # Uncomment if supported
-        #                    val = self.dmm.read_current()
-        #                    self.dmm_measurement_var.set(f"{val:.6f} A")
-                elif mode == "Resistance":
-                    val = self.dmm.read_resistance()
-                    self.dmm_measurement_var.set(f"{val:.2f} Ω")
-                elif mode == "Continuity":
-                    val = self.dmm.read_continuity()
-                    if val < 10:
-                        self.dmm_measurement_var.set(f"Closed ({val:.2f} Ω)")
-                        self.dmm_measurement_label.config(fg="green")
-                    else:
-                        self.dmm_measurement_var.set(f"Open ({val:.2f} Ω)")
-                        self.dmm_measurement_label.config(fg="red")
-            except Exception as e:
-                # You could also log this instead of spamming the status bar
-                print(f"DMM error: {e}")
-            self.root.after(500, self.update_dmm_readings)
-
-    def build_chroma_section(self, ip="192.168.0.10", port=5000):
-        self.chroma = ChromaLoad(ip, port)
-        chroma_frame = tk.LabelFrame(self.root, text="Chroma Load Control")
-        chroma_frame.grid(row=0, rowspan= 2, column=2, columnspan=2, padx=10, pady=10, sticky="nsew")
-        row = 0
-        def btn(text, cmd):
-            nonlocal row
-            b = tk.Button(chroma_frame, text=text, width=30, command=cmd)
-            b.grid(row=row, column=0, pady=2, sticky="ew")
-            row += 1
+        self.update_stk_telemetry()
 
-        btn("Pump", self.initialize_load_pumps)
-        btn("Heater", self.initialize_load_heater)
-        btn("Measure Voltage", self.measure_voltage)
-        btn("Measure Current", self.measure_current)
-        btn("Turn load off", self.load_off)
-        btn("Disable Remote Mode", self.remote_off)
-        
-        self.output = tk.Text(chroma_frame, height=10, width=50, state='disabled')
-        self.output.grid(row=row, column=0, pady=5, sticky="nsew")
-        chroma_frame.columnconfigure(0, weight=1)
-
-    def log(self, text):
-        self.output.configure(state='normal')
-        self.output.insert(tk.END, text + "\n")
-        self.output.see(tk.END)
-        self.output.configure(state='disabled')
-    
-    def remote_off(self):
-        self.chroma.load_off()
-        self.log("Load turned OFF")        
-        self.chroma.remote_off()
-        self.log("Remote mode disabled")
-
-    def load_off(self):
-        self.chroma.load_off()
-        self.log("Load turned OFF")
-
-    def measure_voltage(self):
-        val = self.chroma.measure_voltage()
-        self.log(f"Measured Voltage: {val} V")
+    def build_sweep_section(self):
+        sweep_frame = tk.LabelFrame(self.root, text="Sweep")
+        self.place(sweep_frame)
 
-    def measure_current(self):
-        val = self.chroma.measure_current()
-        self.log(f"Measured Current: {val} A")
-
-    def initialize_load_pumps(self):
-        def task():
-            try:             
-                self.log("Initializing Chroma Load...")
-                self.chroma.remote_on()
-                self.log("Remote mode enabled.")
-                self.chroma.select_channel(3)
-                self.log("Channel 3 selected.")
-                self.chroma.set_mode_cch()
-                self.log("Mode set to CCH.")
-                self.chroma.set_static_current(1)
-                self.log("Static current set to 1 A.")
-                self.chroma.set_slew_rate("0.5", "0.5")
-                self.log("Slew rate rise/fall set to 0.5 A/µS.")
-                self.chroma.load_on()
-                self.log("Load turned ON.")
-            except Exception as e:
-                self.log(f"Failed to initialize: {e}")
-        threading.Thread(target=task).start()
+        self.sweep_psu = tk.StringVar(value=next(iter(self.psus), ""))
+        self.sweep_channel = tk.StringVar(value="1")
+        self.sweep_dmm = tk.StringVar(value=self.dmm_panels[0].dmm.name if self.dmm_panels else "None")
+        self.sweep_start = tk.StringVar(value="0")
+        self.sweep_stop = tk.StringVar(value="12")
+        self.sweep_points = tk.StringVar(value="25")
+        self.sweep_status = tk.StringVar(value="Idle")
 
-    def initialize_load_heater(self):
-        def task():
-            try:             
-                self.log("Initializing Chroma Load...")
-                self.chroma.remote_on()
-                self.log("Remote mode enabled.")
-                self.chroma.select_channel(3)
-                self.log("Channel 3 selected.")
-                self.chroma.set_mode_cch()
-                self.log("Mode set to CCH.")
-                self.chroma.set_static_current(10)
-                self.log("Static current set to 10 A.")
-                self.chroma.set_slew_rate("1.5", "1.5")
-                self.log("Slew rate rise/fall set to 1.5 A/µS.")
-                self.chroma.load_on()
-                self.log("Load turned ON.")
-            except Exception as e:
-                self.log(f"Failed to initialize: {e}")
-        threading.Thread(target=task).start()
+        row = 0
+        tk.Label(sweep_frame, text="PSU:").grid(row=row, column=0, sticky="w", padx=5)
+        ttk.Combobox(sweep_frame, textvariable=self.sweep_psu, values=list(self.psus), state="readonly",
+                     width=10).grid(row=row, column=1, sticky="ew", padx=5, pady=2)
+        row += 1
+        tk.Label(sweep_frame, text="DMM:").grid(row=row, column=0, sticky="w", padx=5)
+        ttk.Combobox(sweep_frame, textvariable=self.sweep_dmm, values=["None"] + [p.dmm.name for p in self.dmm_panels],
+                     state="readonly", width=10).grid(row=row, column=1, sticky="ew", padx=5, pady=2)
+        row += 1
+        tk.Label(sweep_frame, text="Channel:").grid(row=row, column=0, sticky="w", padx=5)
+        tk.OptionMenu(sweep_frame, self.sweep_channel, "1", "2", "1+2").grid(row=row, column=1, sticky="ew", padx=5)
+        for label, var in [("Start (V):", self.sweep_start), ("Stop (V):", self.sweep_stop), ("Points:", self.sweep_points)]:
+            row += 1
+            tk.Label(sweep_frame, text=label).grid(row=row, column=0, sticky="w", padx=5)
+            tk.Entry(sweep_frame, textvariable=var, width=8).grid(row=row, column=1, sticky="ew", padx=5, pady=2)
 
-    def monitor_load(self):
-        if self.chroma.check_load_status():
-            state = self.chroma.check_load_status()
-            self.log(f"state of load:{state}")
-            self.measure_voltage()
-            self.measure_current()
+        row += 1
+        self.sweep_btn = tk.Button(sweep_frame, text="Run Sweep", command=self.run_sweep)
+        self.sweep_btn.grid(row=row, column=0, pady=5, padx=5, sticky="ew")
+        tk.Button(sweep_frame, text="Cancel", command=self.cancel_sweep).grid(row=row, column=1, pady=5, padx=5, sticky="ew")
+        row += 1
+        self.sweep_progress = ttk.Progressbar(sweep_frame, mode="determinate")
+        self.sweep_progress.grid(row=row, column=0, columnspan=2, sticky="ew", padx=5)
+        row += 1
+        tk.Label(sweep_frame, textvariable=self.sweep_status, anchor="w").grid(row=row, column=0, columnspan=2, sticky="ew", padx=5, pady=(0, 5))
 
-        # Schedule the next check after 1000 ms (1 second)
-        self.root.after(1000, self.monitor_load)
+    def run_sweep(self):
+        if self.sweep and self.sweep.running():
+            return
+        try:
+            channels = (1, 2) if self.sweep_channel.get() == "1+2" else (int(self.sweep_channel.get()),)
+            points = np.linspace(float(self.sweep_start.get()), float(self.sweep_stop.get()), int(self.sweep_points.get()))
+            psu = self.psus[self.sweep_psu.get()]
+            dmm_panel = {p.dmm.name: p for p in self.dmm_panels}.get(self.sweep_dmm.get())
+        except (ValueError, KeyError) as e:
+            messagebox.showerror("Sweep", f"Invalid sweep settings: {e}")
+            return
+
+        self.sweep_dmm_panel = dmm_panel
+        if dmm_panel:
+            dmm_panel.busy = True  # the sweep takes its own DMM readings
+        self.sweep = SweepEngine(psu, dmm_panel.dmm if dmm_panel else None)
+        self.sweep.start(channels, np.repeat(points[:, None], len(channels), axis=1))
+        self.sweep_progress.config(maximum=len(points), value=0)
+        self.render.set_var(self.sweep_status, "Running...")
+        self.sweep_btn.config(state="disabled")
+        self.render.add(self.update_sweep)
+
+    def cancel_sweep(self):
+        if self.sweep:
+            self.sweep.cancel()
+
+    def update_sweep(self):
+        # Render source while a sweep runs: shows the newest point; the worker never touches Tk itself.
+        sweep = self.sweep
+        latest = None
+        while not sweep.progress.empty():
+            item = sweep.progress.get_nowait()
+            if item is None:
+                self.render.remove(self.update_sweep)
+                self.finish_sweep()
+                return
+            latest = item
+        if latest is not None:
+            index, total, row = latest
+            self.sweep_progress.config(value=index)
+            reading = f", DMM {row['dmm_mean']:.4f}" if sweep.dmm else ""
+            self.render.set_var(self.sweep_status, f"{index}/{total}: {row['setpoint'][0]:.3f} V{reading}")
+
+    def finish_sweep(self):
+        sweep = self.sweep
+        if self.sweep_dmm_panel:
+            self.sweep_dmm_panel.busy = False
+        self.sweep_btn.config(state="normal")
+        if sweep.error is not None:
+            self.render.set_var(self.sweep_status, f"Sweep failed: {sweep.error}")
+            return
+        path = os.path.join(self.log_dir, time.strftime("sweep-%Y%m%d-%H%M%S.npy"))
+        try:
+            save_result(sweep.result, path)
+            self.render.set_var(self.sweep_status, f"{len(sweep.result)} points saved to {os.path.basename(path)}")
+        except OSError as e:
+            self.render.set_var(self.sweep_status, f"{len(sweep.result)} points, could not save: {e}")
 
     def build_stk500_section(self):
         self.stk500 = None  # Initialize with None until connected
+        self.stk_config = self.registry.config.get("stk500", {})
+        self.stk_telemetry = None  # PollJob reading the telemetry variables
+        self.stk_telemetry_var = tk.StringVar(value="")
 
         stk_frame = tk.LabelFrame(self.root, text="STK500 Interface")
-        stk_frame.grid(row=2, column=1, columnspan=3, padx=10, pady=10, sticky="nsew")
+        self.place_full_width(stk_frame)
         row = 0
 
         # BooleanVars
@@ -242,27 +310,81 @@ class GUI:
             state="disabled"
         )
         self.read_info_btn.grid(row=row, column=0, pady=5)
+        self.apply_stk_btn = tk.Button(stk_frame, text="Apply Selection", width=30,
+                                       command=self.apply_stk_selection, state="disabled")
+        self.apply_stk_btn.grid(row=row, column=1, pady=5)
         row += 1
 
+        # Telemetry variables from the bench config, refreshed by the poll scheduler
+        tk.Label(stk_frame, textvariable=self.stk_telemetry_var, justify="left", anchor="w").grid(
+            row=1, rowspan=5, column=1, sticky="nw", padx=5)
+
         # Output log box
-        self.stk_output = tk.Text(stk_frame, height=10, width=60, state='disabled')
+        self.stk_output = LogConsole(stk_frame, height=10, width=60, log_file=os.path.join(self.log_dir, "stk500.log"))
+        self.render.add(self.stk_output.flush)
         self.stk_output.grid(row=row, column=0, columnspan= 2, pady=5, sticky="nsew")
         stk_frame.columnconfigure(0, weight=1)
 
     def stk_log(self, text):
-        self.stk_output.configure(state='normal')
-        self.stk_output.insert(tk.END, text + "\n")
-        self.stk_output.see(tk.END)
-        self.stk_output.configure(state='disabled')
+        self.stk_output.write(text)
 
     def connect_stk500(self):
         try:
-            self.stk500 = Stk500Controller(com_port="COM9", sdf_provider_class=ComplexSdfProvider)
+            # Imported on first use: loading the stk500 package is slow and most sessions never need it.
+            from SerialConnection import Stk500Controller, ComplexSdfProvider
+            self.stk500 = Stk500Controller(com_port=self.stk_config.get("com_port", "COM9"), sdf_provider_class=ComplexSdfProvider)
             self.stk_log("STK500 connected successfully.")
             self.enable_stk_controls()
             self.disconnect_btn.config(state="normal")  # <-- Enable the disconnect button
+            self.start_stk_telemetry()
         except Exception as e:
             messagebox.showerror("STK500 Connection Error", f"Failed to connect: {e}")
+
+    def apply_stk_selection(self):
+        # All five controls in one serial transaction instead of one per checkbox.
+        from SerialConnection import MANUAL_MODE, HEATER, DHW_PUMP, CH_PUMP, AUX_PUMP
+        try:
+            self.stk500.write_values({
+                MANUAL_MODE: int(self.manual_mode_var.get()),
+                HEATER: int(self.heater_var.get()),
+                DHW_PUMP: int(self.dhw_pump_var.get()),
+                CH_PUMP: int(self.ch_pump_var.get()),
+                AUX_PUMP: int(self.aux_pump_var.get()),
+            })
+            self.stk_log("Selection applied.")
+        except Exception as e:
+            self.stk_log(f"Failed to apply selection: {e}")
+
+    def start_stk_telemetry(self):
+        names = self.stk_config.get("telemetry", [])
+        if names:
+            stk500 = self.stk500
+            self.stk_telemetry = self.scheduler.add(
+                "STK500", lambda: stk500.read_values(names), self.stk_config.get("telemetry_interval", 1.0))
+
+    def stop_stk_telemetry(self):
+        if self.stk_telemetry is not None:
+            self.stk_telemetry.stop()
+            self.stk_telemetry = None
+
+    def update_stk_telemetry(self):
+        if self.stk_telemetry is None:
+            return
+        items = self.stk_telemetry.drain()
+        if not items:
+            return
+        for timestamp, values, error in items:
+            if error is None:
+                for name, value in values.items():
+                    try:
+                        self.store.record("STK500", None, name, float(value), timestamp)
+                    except (TypeError, ValueError):
+                        pass  # not numeric
+        _, values, error = items[-1]
+        if error is not None:
+            self.render.set_var(self.stk_telemetry_var, f"Telemetry error: {error}")
+        else:
+            self.render.set_var(self.stk_telemetry_var, "\n".join(f"{name}: {value}" for name, value in values.items()))
     
     def enable_stk_controls(self):
         self.manual_mode_cb.config(state="normal")
@@ -271,8 +393,10 @@ class GUI:
         self.ch_pump_cb.config(state="normal")
         self.aux_pump_cb.config(state="normal")
         self.read_info_btn.config(state="normal")
+        self.apply_stk_btn.config(state="normal")
 
     def disconnect_stk500(self):
+        self.stop_stk_telemetry()
         if self.stk500 and hasattr(self.stk500.interface, "communication"):
             try:
                 self.stk500.interface.communication.stop = True
@@ -285,4 +409,5 @@ class GUI:
         # Disable controls
         for cb in [self.manual_mode_cb, self.heater_cb, self.dhw_pump_cb, self.ch_pump_cb, self.aux_pump_cb]:
             cb.config(state="disabled")
-        self.read_info_btn.config(state="disabled")
\ No newline at end of file
+        self.read_info_btn.config(state="disabled")
+        self.apply_stk_btn.config(state="disabled")
\ No newline at end of file
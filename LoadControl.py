@@ -0,0 +1,151 @@
+import tkinter as tk
+import threading
+from chroma_load import ChromaLoad
+from transient_capture import TransientCapture
+from log_console import LogConsole
+
+class LoadControlPanel:
+    def __init__(self, parent, chroma: ChromaLoad, scheduler, render, store=None, profiles=(), dmm_panel=None,
+                 log_file=None, rates=(1.0, 5.0)):
+        self.chroma = chroma
+        self.scheduler = scheduler  # shared PollScheduler running the load monitor
+        self.store = store  # optional TimeSeriesStore that keeps every reading
+        self.dmm_panel = dmm_panel  # DMM used for transient captures, if any
+        self.rates = rates  # (active, idle) poll intervals, active while the load is on
+        self.load_on = False  # as of the last poll
+        self.last_error = None
+        self.poller = None
+        self.frame = tk.LabelFrame(parent, text=f"{chroma.name} Load Control")
+
+        row = 0
+        def btn(text, cmd):
+            nonlocal row
+            b = tk.Button(self.frame, text=text, width=30, command=cmd)
+            b.grid(row=row, column=0, pady=2, sticky="ew")
+            row += 1
+
+        for profile in profiles:
+            btn(profile.name, lambda p=profile: self.apply_load_profile(p))
+        btn("Measure Voltage", self.measure_voltage)
+        btn("Measure Current", self.measure_current)
+        btn("Turn load off", self.load_off)
+        if self.dmm_panel:
+            btn("Capture Load-On Transient", self.capture_load_transient)
+        btn("Disable Remote Mode", self.remote_off)
+
+        self.output = LogConsole(self.frame, height=10, width=50, log_file=log_file)
+        render.add(self.output.flush)
+        self.output.grid(row=row, column=0, pady=5, sticky="nsew")
+        self.frame.columnconfigure(0, weight=1)
+
+    def log(self, text):
+        # Safe from worker threads (profile and capture tasks).
+        self.output.write(text)
+
+    def run_in_background(self, action, failure):
+        # Button actions talk to the load, which may take seconds to time out; keep them
+        # off the Tk thread.
+        def task():
+            try:
+                action()
+            except Exception as e:
+                self.log(f"{failure}: {e}")
+        threading.Thread(target=task, daemon=True).start()
+
+    def remote_off(self):
+        def action():
+            self.chroma.load_off()
+            self.log("Load turned OFF")
+            self.chroma.remote_off()
+            self.log("Remote mode disabled")
+        self.run_in_background(action, "Failed to disable remote mode")
+
+    def load_off(self):
+        def action():
+            self.chroma.load_off()
+            self.log("Load turned OFF")
+        self.run_in_background(action, "Failed to turn the load off")
+
+    def measure_voltage(self):
+        def action():
+            val = self.chroma.measure_voltage()
+            self.record("voltage", val)
+            self.log(f"Measured Voltage: {val} V")
+        self.run_in_background(action, "Voltage measurement failed")
+
+    def measure_current(self):
+        def action():
+            val = self.chroma.measure_current()
+            self.record("current", val)
+            self.log(f"Measured Current: {val} A")
+        self.run_in_background(action, "Current measurement failed")
+
+    def record(self, quantity, val, timestamp=None):
+        if self.store is None:
+            return
+        try:
+            self.store.record(self.chroma.name, None, quantity, float(val), timestamp)
+        except ValueError:
+            pass  # not a number (e.g. an error string from the load)
+
+    def apply_load_profile(self, profile):
+        def task():
+            try:
+                self.log(f"Applying load profile '{profile.name}'...")
+                profile.apply(self.chroma)
+                self.log(f"Profile '{profile.name}' applied: {profile.describe()}.")
+            except Exception as e:
+                self.log(f"Failed to initialize: {e}")
+        threading.Thread(target=task).start()
+
+    def capture_load_transient(self):
+        def task():
+            self.dmm_panel.busy = True
+            try:
+                self.log("Arming DMM digitizer and switching load ON...")
+                _, values, metrics = TransientCapture(self.dmm_panel.dmm, self.chroma).run()
+                self.log(f"Captured {len(values)} samples.")
+                self.log(f"Peak: {metrics['peak']:.4f}, overshoot: {metrics['overshoot_pct']:.1f} %, "
+                         f"rise time: {metrics['rise_time'] * 1e3:.3f} ms, "
+                         f"settle time: {metrics['settle_time'] * 1e3:.3f} ms "
+                         f"(load stepped {metrics['edge_time'] * 1e3:.3f} ms after the trigger)")
+            except Exception as e:
+                self.log(f"Transient capture failed: {e}")
+            finally:
+                self.dmm_panel.busy = False
+        threading.Thread(target=task).start()
+
+    def start_polling(self):
+        self.stop_polling()
+        active, idle = self.rates
+        self.poller = self.scheduler.add(self.chroma.name, self.read_load_state, active, idle, lambda: self.load_on)
+
+    def stop_polling(self):
+        if self.poller is not None:
+            self.poller.stop()
+            self.poller = None
+
+    def read_load_state(self):
+        # Runs on a poll scheduler thread: voltage and current are only read while the load is on.
+        self.load_on = self.chroma.check_load_status()
+        if not self.load_on:
+            return False, None, None
+        return True, self.chroma.measure_voltage(), self.chroma.measure_current()
+
+    def update_live_readings(self):
+        if self.poller is None:
+            return
+        for timestamp, reading, error in self.poller.drain():
+            if error is not None:
+                if str(error) != self.last_error:  # log each new problem once
+                    self.log(f"Load monitor error: {error}")
+                    self.last_error = str(error)
+                continue
+            self.last_error = None
+            state, voltage, current = reading
+            if state:
+                self.log(f"state of load:{state}")
+                self.record("voltage", voltage, timestamp)
+                self.log(f"Measured Voltage: {voltage} V")
+                self.record("current", current, timestamp)
+                self.log(f"Measured Current: {current} A")
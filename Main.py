@@ -1,22 +1,38 @@
+import time
+STARTED = time.perf_counter()  # before the heavy imports, so they are part of the startup time
+
+import argparse
+import json
 import tkinter as tk
-from cpx400dp import CPX400DP
+from instrument_registry import InstrumentRegistry, get_config_path
 from GUIinterface import GUI
 
+STARTUP_TARGET = 1.0  # seconds until the window is usable
+
+def report_startup():
+    elapsed = time.perf_counter() - STARTED
+    note = "" if elapsed <= STARTUP_TARGET else f" (target {STARTUP_TARGET:.1f} s)"
+    print(f"Window ready in {elapsed:.2f} s{note}")
+
 def main():
+    parser = argparse.ArgumentParser(description="Service tools for PCBA")
+    parser.add_argument("config", nargs="?", help="bench config file (default: bench.json)")
+    parser.add_argument("--discover", metavar="SUBNET", help="find the instruments on e.g. 192.168.0.0/24 instead")
+    args = parser.parse_args()
+
     root = tk.Tk()
 
-    # Create PSU instances (use actual IPs or mock)
-    psuL = CPX400DP("192.168.0.105")
-    psuR = CPX400DP("192.168.0.103")
-    dmm_ip = "192.168.0.104"
-    # ✅ Define the psus dictionary
-    psus = {
-        "PSU Left": psuL,
-        "PSU Right": psuR
-    }
-
-    # ✅ Now pass it into the GUI
-    app = GUI(root, psus, dmm_ip=dmm_ip)
+    # Instruments come from bench.json, the config file given on the command line, or discovery.
+    if args.discover:
+        from discovery import discover_registry
+        with open(args.config or get_config_path(), encoding="utf-8") as f:
+            base = json.load(f)  # keeps poll_workers/columns
+        registry = discover_registry(args.discover, base)
+    else:
+        registry = InstrumentRegistry.from_file(args.config)
+
+    app = GUI(root, registry)
+    root.after_idle(report_startup)
     root.mainloop()
 
 if __name__ == "__main__":
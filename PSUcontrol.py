@@ -3,8 +3,13 @@ from tkinter import messagebox
 from cpx400dp import CPX400DP
 
 class PSUControlPanel:
-    def __init__(self, parent, psu: CPX400DP):
+    def __init__(self, parent, psu: CPX400DP, scheduler, render, store=None, rates=(0.5, 2.0)):
         self.psu = psu
+        self.scheduler = scheduler  # shared PollScheduler running the live reads
+        self.render = render  # RenderScheduler; the status and live labels only change through it
+        self.store = store  # optional TimeSeriesStore that keeps every reading
+        self.rates = rates  # (active, idle) poll intervals, active while an output is on
+        self.poller = None
         self.frame = tk.LabelFrame(parent, text=psu.name, padx=10, pady=10)
 
         self.status_var = tk.StringVar(value="Disconnected")
@@ -90,18 +95,20 @@ class PSUControlPanel:
     def connect(self):
         try:
             self.psu.connect()
-            self.status_var.set("Connected")
+            self.render.set_var(self.status_var, "Connected")
             for btn in self.output_buttons.values():
                 btn.config(state="normal")  # Enable buttons
+            self.start_polling()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to connect: {e}")
 
     def disconnect(self):
+        self.stop_polling()
         try:
             for ch in [1, 2]:
                 self.psu.output_off(ch)
             self.psu.disconnect()
-            self.status_var.set("Disconnected")
+            self.render.set_var(self.status_var, "Disconnected")
             for btn in self.output_buttons.values():
                 btn.config(state="disabled")  # Disable buttons again
         except Exception as e:
@@ -113,7 +120,11 @@ class PSUControlPanel:
             self.psu.output_on(channel)
             btn["text"] = f"Turn CH{channel} OFF"
         else:
-            self.psu.output_off(channel)
+            try:
+                self.psu.output_off(channel)
+            except Exception as e:
+                messagebox.showerror("Error", f"CH{channel} may still be ON: {e}")
+                return
             btn["text"] = f"Turn CH{channel} ON"
 
     def apply_settings(self):
@@ -142,6 +153,7 @@ class PSUControlPanel:
 
                 self.psu.set_voltage(ch, voltage)
                 self.psu.set_current(ch, current)
+            self.psu.flush()  # only report success once the changed values were written
 
             messagebox.showinfo("Settings Applied", "Voltage and current set successfully.")
         except ValueError as ve:
@@ -152,22 +164,46 @@ class PSUControlPanel:
     def read_values(self):
         try:
             values = []
-            for ch in [1, 2]:
-                v = self.psu.read_voltage(ch)
-                i = self.psu.read_current(ch)
-                values.append(f"CH{ch}: {v} V / {i} A")
+            for ch, (v, i) in self.psu.read_all((1, 2)).items():
+                values.append(f"CH{ch}: {v:.3f} V / {i:.3f} A")
             messagebox.showinfo("Read Values", "\n".join(values))
         except Exception as e:
             messagebox.showerror("Read Error", str(e))
 
+    def start_polling(self):
+        self.stop_polling()
+        active, idle = self.rates
+        self.poller = self.scheduler.add(self.psu.name, self.read_live_values, active, idle, self.psu.output_enabled)
+
+    def stop_polling(self):
+        if self.poller is not None:
+            self.poller.stop()
+            self.poller = None
+
+    def read_live_values(self):
+        # Runs on a poll scheduler thread, never touch widgets here.
+        return self.psu.read_all((1, 2))
+
     def update_live_readings(self):
-        if self.psu is not None:
-            try:
-                for ch in [1, 2]:
-                    voltage = self.psu.read_voltage(ch)
-                    current = self.psu.read_current(ch)
-                    self.live_voltage_labels[ch].config(text=f"{voltage:} V")
-                    self.live_current_labels[ch].config(text=f"{current:} A")
-            except Exception as e:
-                # Show error only once or log it, otherwise it will spam the GUI.
-                self.status_var.set(f"Error reading PSU: {e}")
\ No newline at end of file
+        # Called every frame: only picks up whatever the poller published last.
+        if self.poller is None:
+            return
+        items = self.poller.drain()
+        if not items:
+            return
+        if self.store is not None:
+            for timestamp, readings, error in items:
+                if error is None:
+                    for ch, (voltage, current) in readings.items():
+                        self.store.record(self.psu.name, ch, "voltage", voltage, timestamp)
+                        self.store.record(self.psu.name, ch, "current", current, timestamp)
+        _, readings, error = items[-1]
+        if error is not None:
+            # Show error only once or log it, otherwise it will spam the GUI.
+            retry = f" (unreachable, retrying every {self.scheduler.max_backoff:g} s)" if self.poller.state == "open" else ""
+            self.render.set_var(self.status_var, f"Error reading PSU: {error}{retry}")
+            return
+        self.render.set_var(self.status_var, "Connected")
+        for ch, (voltage, current) in readings.items():
+            self.render.set_text(self.live_voltage_labels[ch], f"{voltage:.3f} V")
+            self.render.set_text(self.live_current_labels[ch], f"{current:.3f} A")
\ No newline at end of file
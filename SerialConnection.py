@@ -1,5 +1,10 @@
+import functools
+import hashlib
+import importlib.metadata
 import os
+import pickle
 import sys
+import threading
 
 from stk500.STK500_interface import STK500_interface
 from stk500.SDF_read import SDF_read
@@ -16,7 +21,20 @@ class SimpleSdfProvider(SDF_read):
 
 class ComplexSdfProvider(SDF_read):
     def __init__(self, communication=None, sdf_path=None):
+        # The parsed SDF is cached on disk per file hash; reconnecting to a DUT with the
+        # same SDF restores it instead of parsing the file again.
+        path = resolve_sdf(sdf_path)
+        digest = sdf_digest(path)
+        state = load_sdf_snapshot(digest)
+        if state is not None:
+            for key in state.pop(COMMUNICATION_KEYS):
+                state[key] = communication
+            self.__dict__.update(state)
+            self.sdf_path = path
+            return
+        self.requested_sdf = path  # read by prepare_sdf during SDF_read.__init__
         super(ComplexSdfProvider, self).__init__(communication, sdf_path)
+        save_sdf_snapshot(digest, self, communication)
 
     def get_sdf(self, file_path):
         # Optionally process or validate here
@@ -24,21 +42,7 @@ class ComplexSdfProvider(SDF_read):
         return file_path
 
     def prepare_sdf(self):
-        resources_folder = get_resources_path()
-        if not resources_folder.exists():
-            raise FileNotFoundError(f"Resources folder not found at {resources_folder}")
-
-        matching_sdf = None
-        for sdf_file in resources_folder.glob('*.sdf'):
-            matching_sdf = sdf_file
-            break
-
-        if matching_sdf is None:
-            raise FileNotFoundError("No matching .sdf file found in Resources folder.")
-
-        self.sdf_path = self.get_sdf(matching_sdf)
-
-        self.sdf_path = self.get_sdf(matching_sdf)
+        self.sdf_path = self.get_sdf(getattr(self, "requested_sdf", None) or find_sdf())
 
 def get_resources_path():
     if hasattr(sys, '_MEIPASS'):
@@ -49,32 +53,154 @@ def get_resources_path():
         base_path = Path(__file__).parent.resolve()
     return base_path / 'Resources'
 
+@functools.lru_cache(maxsize=None)
+def find_sdf(folder=None):
+    # First .sdf file in the folder (default Resources); resolved once per process.
+    resources_folder = folder or get_resources_path()
+    if not resources_folder.exists():
+        raise FileNotFoundError(f"Resources folder not found at {resources_folder}")
+    for sdf_file in sorted(resources_folder.glob('*.sdf')):
+        return sdf_file
+    raise FileNotFoundError(f"No matching .sdf file found in {resources_folder}.")
+
+def resolve_sdf(sdf_path=None):
+    # The SDF a provider was given: a file, a folder holding one, or None for Resources.
+    if sdf_path is None:
+        return find_sdf()
+    path = Path(sdf_path)
+    return find_sdf(path) if path.is_dir() else path
+
+
+# Bump when the snapshot layout changes; old snapshots are then ignored.
+SDF_CACHE_VERSION = b"1"
+COMMUNICATION_KEYS = "__communication_keys__"
+
+def get_sdf_cache_path():
+    # Outside the PyInstaller bundle, which is unpacked to a new temp folder on every start.
+    base_path = Path(os.environ.get("LOCALAPPDATA") or Path.home() / ".cache")
+    return base_path / "GUI-for-a-lab" / "sdf"
+
+@functools.lru_cache(maxsize=None)
+def parser_fingerprint():
+    # Changes with the stk500 release and with the SDF_read source, so snapshots pickled
+    # by another parser version are never restored.
+    try:
+        version = importlib.metadata.version("stk500")
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+    digest = hashlib.sha256(version.encode())
+    try:
+        with open(sys.modules[SDF_read.__module__].__file__, "rb") as f:
+            digest.update(f.read())
+    except (OSError, AttributeError, TypeError):
+        pass  # no source on disk (frozen build): the version alone has to do
+    return digest.digest()
+
+def sdf_digest(path):
+    digest = hashlib.sha256(SDF_CACHE_VERSION)
+    digest.update(parser_fingerprint())
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+def load_sdf_snapshot(digest):
+    # Any snapshot that cannot be restored is a cache miss; the SDF is parsed again.
+    try:
+        with open(get_sdf_cache_path() / f"{digest}.pickle", "rb") as f:
+            state = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # unpickling runs arbitrary stk500 code paths
+        print(f"Ignoring unreadable SDF cache: {e}")
+        return None
+    if not isinstance(state, dict) or COMMUNICATION_KEYS not in state:
+        print("Ignoring SDF cache with an unknown layout")
+        return None
+    return state
+
+def save_sdf_snapshot(digest, provider, communication):
+    # Everything SDF_read parsed, minus the live serial connection, which is reattached on load.
+    state = dict(vars(provider))
+    keys = [key for key, value in state.items() if communication is not None and value is communication]
+    for key in keys:
+        del state[key]
+    state[COMMUNICATION_KEYS] = keys
+    folder = get_sdf_cache_path()
+    try:
+        folder.mkdir(parents=True, exist_ok=True)
+        temp = folder / f"{digest}.tmp"
+        with open(temp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, folder / f"{digest}.pickle")  # readers never see a partial file
+    except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+        print(f"SDF not cached: {e}")
+
+
+def single_value(value):
+    # read_value([name]) may answer [value] or just value.
+    if isinstance(value, (list, tuple)) and len(value) == 1:
+        return value[0]
+    return value
+
+
+# SDF variables behind the manual controls.
+MANUAL_MODE = "o_control_state"
+HEATER = "ElecHeater_manual_request"
+DHW_PUMP = "Pump_dhw_manual_request"
+CH_PUMP = "Pump_water_manual_request"
+AUX_PUMP = "Pump_floor_manual_request"
+
 
 class Stk500Controller:
     def __init__(self, com_port, sdf_provider_class):
         self.interface = STK500_interface(SDF_class=sdf_provider_class, com=com_port)
         self.interface.initialize_connection()
+        # The serial link carries one transaction at a time; shared by the GUI and the telemetry poller.
+        self.lock = threading.Lock()
+        self.batch_reads = True  # until read_value turns out to take one name at a time
 
     def print_device_info(self, log=print):
-        log(f'Attached SN: {self.interface.read_sn()}')
-        log(f'HW version: {self.interface.read_hardware_version()}')
-        log(f'SW version: {self.interface.read_software_version()}')
-        log(f'Factory settings: {self.interface.read_factory_settings()}')
+        with self.lock:
+            log(f'Attached SN: {self.interface.read_sn()}')
+            log(f'HW version: {self.interface.read_hardware_version()}')
+            log(f'SW version: {self.interface.read_software_version()}')
+            log(f'Factory settings: {self.interface.read_factory_settings()}')
+
+    def write_values(self, values):
+        # Writes several SDF variables, e.g. {MANUAL_MODE: 1, HEATER: 1}, in one serial transaction.
+        with self.lock:
+            return self.interface.write_value(list(values), list(values.values()))
+
+    def read_values(self, names):
+        # Reads several SDF variables, in one serial transaction if read_value takes a list
+        # of names like write_value does; returns {name: value}. Otherwise every name is
+        # read on its own, as [name] the way the single writes pass it.
+        names = list(names)
+        with self.lock:
+            if self.batch_reads:
+                try:
+                    values = list(self.interface.read_value(names))
+                    if len(values) == len(names):
+                        return dict(zip(names, values))
+                except TypeError:
+                    pass
+                self.batch_reads = False
+            return {name: single_value(self.interface.read_value([name])) for name in names}
 
     def manual_mode(self, value):
-        return self.interface.write_value(["o_control_state"], [value])
+        return self.write_values({MANUAL_MODE: value})
 
     def activate_heater(self, value):
-        return self.interface.write_value(["ElecHeater_manual_request"], [value])   
+        return self.write_values({HEATER: value})
 
     def activate_DHW_pump(self, value):
-        return self.interface.write_value(["Pump_dhw_manual_request"], [value])
+        return self.write_values({DHW_PUMP: value})
 
     def activate_CH_pump(self, value):
-        return self.interface.write_value(["Pump_water_manual_request"], [value])
-        
+        return self.write_values({CH_PUMP: value})
+
     def activate_AUX_pump(self, value):
-        return self.interface.write_value(["Pump_floor_manual_request"], [value])
+        return self.write_values({AUX_PUMP: value})
 
 #print(f'{stk500_interface.write_table(table = "V", values = [63])}')
 
@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PollJob:
+    # One periodic read owned by a PollScheduler. Readings are published as
+    # (timestamp, values, error) tuples, so the Tk loop never waits on the network.
+    # read_fn may return None to skip a cycle (e.g. while a capture owns the DMM).
+    # While active_fn() is true (an output or load is on) the job runs every
+    # interval, otherwise every idle_interval.
+    def __init__(self, name, read_fn, interval=0.5, idle_interval=None, active_fn=None):
+        self.name = name
+        self.read_fn = read_fn
+        self.interval = interval
+        self.idle_interval = idle_interval or interval
+        self.active_fn = active_fn
+        self.readings = queue.Queue()
+        self.next_due = time.monotonic()
+        self.in_flight = False
+        self.stopped = False
+        self.failures = 0  # consecutive failed reads
+        self.state = "ok"  # "ok", "backoff" or "open" (circuit breaker tripped)
+
+    def current_interval(self):
+        if self.active_fn is None:
+            return self.interval
+        try:
+            active = self.active_fn()
+        except Exception:
+            active = False
+        return self.interval if active else self.idle_interval
+
+    def stop(self):
+        self.stopped = True
+
+    def drain(self):
+        items = []
+        while True:
+            try:
+                items.append(self.readings.get_nowait())
+            except queue.Empty:
+                return items
+
+    def latest(self):
+        items = self.drain()
+        return items[-1] if items else None
+
+
+class PollScheduler:
+    # Runs the periodic reads of every instrument on one bounded thread pool instead
+    # of a thread per instrument. A job is not queued again while its previous read is
+    # still in flight, so a slow or unreachable instrument only delays itself.
+    #
+    # Failed reads back off exponentially; after breaker_threshold failures in a row
+    # the job is only probed every max_backoff seconds until it answers again.
+    # io_budget caps the reads per second across all jobs (None: no cap); when it is
+    # exhausted the longest-waiting jobs go first.
+    def __init__(self, max_workers=4, name="poll", io_budget=None, max_backoff=30.0, breaker_threshold=3):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.io_budget = io_budget
+        self.max_backoff = max_backoff
+        self.breaker_threshold = breaker_threshold
+        self.tokens = float(io_budget or 0)
+        self.refilled = time.monotonic()
+        self.jobs = []
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name=f"{name}-scheduler", daemon=True)
+        self.thread.start()
+
+    def add(self, name, read_fn, interval=0.5, idle_interval=None, active_fn=None):
+        job = PollJob(name, read_fn, interval, idle_interval, active_fn)
+        with self.lock:
+            self.jobs.append(job)
+        self.wakeup.set()
+        return job
+
+    def _run(self):
+        while not self.closed:
+            self.wakeup.clear()
+            now = time.monotonic()
+            with self.lock:
+                self.jobs = [job for job in self.jobs if not job.stopped]
+                due = sorted((job for job in self.jobs if not job.in_flight and job.next_due <= now),
+                             key=lambda job: job.next_due)
+                if self.io_budget:
+                    self._refill(now)
+                    due = due[:int(self.tokens)]
+                    self.tokens -= len(due)
+                for job in due:
+                    job.in_flight = True
+                waits = [job.next_due - now for job in self.jobs if not job.in_flight]
+            for job in due:
+                self.executor.submit(self._poll, job)
+            if self.io_budget and waits and min(waits) <= 0:
+                # Jobs are due but the budget is spent: wait for the next token.
+                waits = [(1 - self.tokens) / self.io_budget]
+            self.wakeup.wait(min(waits, default=1.0))
+
+    def _refill(self, now):
+        # Token bucket holding at most one second of budget (and at least one read).
+        self.tokens = min(max(1.0, self.io_budget), self.tokens + (now - self.refilled) * self.io_budget)
+        self.refilled = now
+
+    def _poll(self, job):
+        started = time.monotonic()
+        try:
+            values = job.read_fn()
+        except Exception as e:
+            job.failures += 1
+            if job.failures >= self.breaker_threshold:
+                job.state = "open"
+                delay = self.max_backoff
+            else:
+                job.state = "backoff"
+                delay = min(job.current_interval() * 2 ** job.failures, self.max_backoff)
+            job.readings.put((time.time(), None, e))
+        else:
+            job.failures = 0
+            job.state = "ok"
+            delay = job.current_interval()
+            if values is not None:
+                job.readings.put((time.time(), values, None))
+        job.next_due = started + delay
+        job.in_flight = False
+        self.wakeup.set()
+
+    def shutdown(self):
+        self.closed = True
+        self.wakeup.set()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+from cpx400dp import parse_reading
+from power_supply_interface import AsyncPowerSupplyInterface
+from instrumentation import STATS
+
+
+class AsyncInstrument:
+    # Line based SCPI over asyncio streams. The per-device lock keeps request/reply
+    # pairs together while different devices run concurrently on the same loop.
+    def __init__(self, ip: str, port: int, timeout: float = 2.0):
+        self.ip = ip
+        self.port = port
+        self.timeout = timeout
+        self.name = f"{type(self).__name__}-{ip}"
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.ip, self.port), self.timeout)
+
+    async def disconnect(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = None
+        self.writer = None
+
+    async def _ensure_connected(self):
+        if self.writer is None:
+            await self.connect()
+
+    async def _read_line(self):
+        line = await asyncio.wait_for(self.reader.readuntil(b"\n"), self.timeout)
+        return line.decode(errors="replace").strip()
+
+    async def _exchange(self, commands, replies):
+        async with self.lock:
+            try:
+                await self._ensure_connected()
+                payload = "".join(command + "\n" for command in commands).encode()
+                with STATS.measure(self.name, commands[0] if len(commands) == 1 else "batch") as io:
+                    self.writer.write(payload)
+                    await self.writer.drain()
+                    io["bytes_out"] = len(payload)
+                    responses = [await self._read_line() for _ in range(replies)]
+                    io["bytes_in"] = sum(len(r) + 1 for r in responses)
+                return responses
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError):
+                # The stream position is unknown now, start over on the next call.
+                await self.disconnect()
+                raise
+
+    async def write(self, command: str):
+        await self._exchange([command], 0)
+
+    async def query(self, command: str):
+        return (await self._exchange([command], 1))[0]
+
+    async def query_many(self, commands):
+        return await self._exchange(commands, len(commands))
+
+
+class AsyncCPX400DP(AsyncInstrument, AsyncPowerSupplyInterface):
+    def __init__(self, ip: str, port: int = 9221, timeout: float = 2.0):
+        super().__init__(ip, port, timeout)
+        self.name = f"CPX400DP-{ip}"
+
+    async def get_id(self):
+        return await self.query("*IDN?")
+
+    async def set_voltage(self, channel: int, voltage: float):
+        await self.write(f"V{channel} {voltage:.3f}")
+
+    async def set_current(self, channel: int, current: float):
+        await self.write(f"I{channel} {current:.3f}")
+
+    async def output_on(self, channel: int):
+        await self.write(f"OP{channel} 1")
+
+    async def output_off(self, channel: int):
+        await self.write(f"OP{channel} 0")
+
+    async def read_voltage(self, channel: int):
+        return await self.query(f"V{channel}?")
+
+    async def read_current(self, channel: int):
+        return await self.query(f"I{channel}?")
+
+    async def read_all(self, channels=(1, 2)):
+        commands = []
+        for ch in channels:
+            commands += [f"V{ch}?", f"I{ch}?"]
+        values = [parse_reading(r) for r in await self.query_many(commands)]
+        return {ch: (values[2 * n], values[2 * n + 1]) for n, ch in enumerate(channels)}
+
+
+class AsyncDMM6500(AsyncInstrument):
+    def __init__(self, ip: str, port: int = 5025, timeout: float = 2.0):
+        super().__init__(ip, port, timeout)
+        self.name = f"DMM6500-{ip}"
+
+    async def read_voltage(self):
+        return float(await self.query("MEAS:VOLT:DC?"))
+
+    async def read_current(self):
+        return float(await self.query("MEAS:CURR:DC?"))
+
+    async def read_resistance(self):
+        return float(await self.query("MEAS:RES?"))
+
+    async def read_continuity(self):
+        return float(await self.query("MEAS:CONT?"))
+
+
+class AsyncChromaLoad(AsyncInstrument):
+    def __init__(self, ip: str, port: int = 5000, timeout: float = 2.0):
+        super().__init__(ip, port, timeout)
+        self.name = f"Chroma-{ip}"
+
+    async def load_on(self):
+        await self.write("LOAD:STATe ON")
+
+    async def load_off(self):
+        await self.write("LOAD:STATe OFF")
+
+    async def measure_voltage(self):
+        return await self.query("MEAS:VOLT?")
+
+    async def measure_current(self):
+        return await self.query("MEAS:CURR?")
+
+    async def check_load_status(self):
+        return (await self.query("LOAD:STATe?")) in ["1"]
+
+    async def apply_commands(self, commands):
+        response = await self.query(";:".join(list(commands) + ["*OPC?"]))
+        if response != "1":
+            raise RuntimeError(f"Load did not confirm command batch (got '{response}').")
+
+
+async def poll_all(readers: dict):
+    # readers maps a name to a zero-argument coroutine function. All of them run at
+    # once, so a cycle takes as long as the slowest device. Failures come back as the
+    # exception instance instead of cancelling the other polls.
+    results = await asyncio.gather(*(read() for read in readers.values()), return_exceptions=True)
+    return dict(zip(readers.keys(), results))
+
+
+class AsyncLoopThread:
+    # Runs an asyncio event loop next to the Tk main loop. Coroutines are submitted from
+    # the Tk thread and their results are handed back through root.after.
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="asyncio-loop", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run_in_tk(self, root, coro, callback, poll_ms=20):
+        # callback(result, error) is always invoked on the Tk thread.
+        future = self.submit(coro)
+
+        def check():
+            if not future.done():
+                root.after(poll_ms, check)
+                return
+            error = future.exception()
+            callback(None if error else future.result(), error)
+
+        root.after(poll_ms, check)
+        return future
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2)
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+from cpx400dp import CPX400DP
+from keithleyDMM6500 import DMM6500
+from chroma_load import ChromaLoad
+from async_instruments import AsyncCPX400DP, AsyncDMM6500, AsyncChromaLoad, poll_all
+from instrument_registry import InstrumentRegistry
+from simulators import CPX400DPSimulator, DMM6500Simulator, ChromaLoadSimulator
+
+# Drives the real driver classes (and optionally the GUI) against the local simulators
+# and reports timings as JSON, so changes to the I/O paths can be compared run to run.
+
+
+def summarize(durations):
+    ms = np.asarray(durations) * 1000
+    return {
+        "count": len(ms),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def time_calls(fn, repeat):
+    fn()  # warm-up: connect, fill caches
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+def start_simulators(options, psu_count=2):
+    psus = [CPX400DPSimulator(port=0, **options).start() for _ in range(psu_count)]
+    dmm = DMM6500Simulator(port=0, **options).start()
+    chroma = ChromaLoadSimulator(port=0, **options).start()
+    return psus, dmm, chroma
+
+
+def bench_drivers(options, repeat):
+    psu_sims, dmm_sim, chroma_sim = start_simulators(options, psu_count=1)
+    try:
+        psu = CPX400DP(*psu_sims[0].address)
+        psu.connect()
+        dmm = DMM6500(*dmm_sim.address)
+        chroma = ChromaLoad(*chroma_sim.address)
+        results = {
+            "cpx400dp.send_command": time_calls(lambda: psu.send_command("V1?", expect_response=True), repeat),
+            # Every call goes to the PSU; the cached entry shows what repeat readers pay.
+            "cpx400dp.read_all": time_calls(lambda: (psu.cache.clear(), psu.read_all()), repeat),
+            "cpx400dp.read_all_cached": time_calls(psu.read_all, repeat),
+            "dmm6500.query": time_calls(lambda: dmm.query("MEAS:VOLT:DC?"), repeat),
+            "chroma.send_command": time_calls(lambda: chroma.send_command("LOAD:STATe?"), repeat),
+        }
+        psu.disconnect()
+        dmm.close()
+        chroma.disconnect()
+        return results
+    finally:
+        for sim in psu_sims + [dmm_sim, chroma_sim]:
+            sim.stop()
+
+
+def bench_poll_cycle(options, repeat, psu_count=2):
+    # One acquisition cycle over every instrument: the blocking drivers one after the
+    # other against the asyncio drivers polled concurrently on a single loop.
+    psu_sims, dmm_sim, chroma_sim = start_simulators(options, psu_count)
+    loop = asyncio.new_event_loop()
+    try:
+        psus = [CPX400DP(*sim.address) for sim in psu_sims]
+        for psu in psus:
+            psu.connect()
+        dmm = DMM6500(*dmm_sim.address)
+        chroma = ChromaLoad(*chroma_sim.address)
+
+        def sequential():
+            for psu in psus:
+                psu.cache.clear()
+                psu.read_all()
+            dmm.read_voltage()
+            chroma.measure_voltage()
+
+        readers = {f"psu{n}": AsyncCPX400DP(*sim.address).read_all for n, sim in enumerate(psu_sims)}
+        readers["dmm"] = AsyncDMM6500(*dmm_sim.address).read_voltage
+        readers["chroma"] = AsyncChromaLoad(*chroma_sim.address).measure_voltage
+
+        def concurrent():
+            results = loop.run_until_complete(poll_all(readers))
+            errors = [r for r in results.values() if isinstance(r, Exception)]
+            if errors:
+                raise errors[0]
+
+        results = {
+            "sequential": time_calls(sequential, repeat),
+            "concurrent": time_calls(concurrent, repeat),
+        }
+        for psu in psus:
+            psu.disconnect()
+        dmm.close()
+        chroma.disconnect()
+        for read in readers.values():
+            loop.run_until_complete(read.__self__.disconnect())
+        return results
+    finally:
+        loop.close()
+        for sim in psu_sims + [dmm_sim, chroma_sim]:
+            sim.stop()
+
+
+def bench_gui(options, duration, tick_ms=10):
+    import tkinter as tk
+
+    try:
+        from GUIinterface import GUI
+        root = tk.Tk()
+    except (ImportError, tk.TclError) as e:
+        return {"skipped": f"GUI not available: {e}"}
+    root.withdraw()
+
+    psu_sims, dmm_sim, chroma_sim = start_simulators(options)
+    try:
+        def spec(name, sim):
+            return {"name": name, "ip": sim.address[0], "port": sim.address[1]}
+        registry = InstrumentRegistry({
+            "psus": [spec(f"PSU {n + 1}", sim) for n, sim in enumerate(psu_sims)],
+            "dmms": [spec("DMM", dmm_sim)],
+            "loads": [spec("Chroma", chroma_sim)],
+        })
+        app = GUI(root, registry, log_dir=tempfile.mkdtemp(prefix="bench-log-"))
+        for panel in app.psu_panels:
+            panel.connect()
+
+        # The render scheduler times its own frames; time the acquisition cycle they hide.
+        acquisition_cycles = []
+        for panel in app.psu_panels:
+            read = panel.read_live_values
+
+            def timed_read(read=read):
+                started = time.perf_counter()
+                try:
+                    return read()
+                finally:
+                    acquisition_cycles.append(time.perf_counter() - started)
+            panel.poller.read_fn = timed_read
+
+        # Event-loop stall: how late a short after() callback fires.
+        stalls = []
+
+        def tick(scheduled):
+            stalls.append(max(0.0, time.perf_counter() - scheduled - tick_ms / 1000))
+            root.after(tick_ms, tick, time.perf_counter())
+        root.after(tick_ms, tick, time.perf_counter())
+
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            root.update()
+            time.sleep(0.001)
+
+        frames = list(app.render.frame_times)
+        updates = app.render.updates
+        app.on_close()
+        return {
+            "render_frame": summarize(frames) if frames else None,
+            "widget_updates": updates,
+            "acquisition_cycle": summarize(acquisition_cycles) if acquisition_cycles else None,
+            "event_loop_stall": summarize(stalls) if stalls else None,
+        }
+    finally:
+        for sim in psu_sims + [dmm_sim, chroma_sim]:
+            sim.stop()
+
+
+def is_bench_config(path):
+    # True for an existing bench configuration (see bench.json), which must not be
+    # replaced by a report.
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(config, dict) and any(kind in config for kind in ("psus", "dmms", "loads"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the instrument I/O paths against the simulators.")
+    parser.add_argument("--repeat", type=int, default=200, help="calls per driver command")
+    parser.add_argument("--gui-seconds", type=float, default=5.0, help="GUI run time, 0 to skip")
+    parser.add_argument("--latency", type=float, default=0.001)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--split", action="store_true")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+    if args.output and is_bench_config(args.output):
+        parser.error(f"{args.output} is a bench configuration, choose another --output file")
+
+    options = dict(latency=args.latency, jitter=args.jitter, split_packets=args.split)
+    report = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": options,
+    }
+    # The drivers print connection messages; keep stdout clean for the JSON report.
+    with contextlib.redirect_stdout(sys.stderr):
+        report["drivers"] = bench_drivers(options, args.repeat)
+        report["poll_cycle"] = bench_poll_cycle(options, args.repeat)
+        if args.gui_seconds > 0:
+            report["gui"] = bench_gui(options, args.gui_seconds)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,57 +1,288 @@
+import select
 import socket
+import threading
+import time
+from socket_reader import SocketReader
+from instrumentation import STATS
+from state_cache import StateCache
+
+MODES = ["CCL", "CCH", "CCDL", "CCDH", "CRL", "CRH", "CV"]
+
+CACHE_TTLS = {"LOAD:STATe?": 0.5, "MEAS:VOLT?": 0.2, "MEAS:CURR?": 0.2, "*IDN?": 3600.0}
+MEASUREMENTS = ("MEAS:VOLT?", "MEAS:CURR?")
+# Set points that are not tied to the selected channel.
+GLOBAL_HEADERS = ("CHAN", "CONF:REM")
+# Always sent: the load can switch itself off (protection, front panel) at any time.
+UNSKIPPABLE_HEADERS = ("LOAD:STATE",)
+STATE_WORDS = {"ON": "1", "OFF": "0"}
+
+def same_setting(a, b):
+    a, b = STATE_WORDS.get(a.upper(), a), STATE_WORDS.get(b.upper(), b)
+    try:
+        return float(a) == float(b)
+    except ValueError:
+        return a.upper() == b.upper()
 
 class ChromaLoad:
-    def __init__(self, ip, port=5000):
+    def __init__(self, ip, port=5000, timeout=2.0, max_retries=3, backoff=0.2, max_backoff=2.0, name=None):
         self.ip = ip
         self.port = port
+        self.name = name or f"Chroma-{ip}"
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.recorder = None  # optional MeasurementLogger fed by the measure methods
+        self.cache = StateCache(CACHE_TTLS)
+
+        # One persistent connection shared by the GUI and worker threads.
+        self.sock = None
+        self.reader = None
+        self.lock = threading.RLock()
+        self.stats = {
+            "connects": 0,
+            "reconnects": 0,
+            "commands": 0,
+            "errors": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+        }
+        # Same counters, but reset every time a new connection is opened.
+        self.connection_stats = {}
+
+        # Shadow copies of the last confirmed set points: {"CHAN": "3", ("3", "MODE"): "CCH"}.
+        self.setpoints = {}
+
+    def connect(self):
+        with self.lock:
+            if self.sock is not None:
+                return
+            sock = socket.create_connection((self.ip, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock = sock
+            self.reader = SocketReader(sock)
+            if self.stats["connects"]:
+                self.stats["reconnects"] += 1
+                STATS.record_reconnect(self.name)
+            self.stats["connects"] += 1
+            self.connection_stats = {
+                "opened_at": time.time(),
+                "commands": 0,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+            }
+            # Whatever happened while we were away, the shadows can no longer be trusted.
+            # Re-read them now so no user action pays for it; a failure drops the socket.
+            self.setpoints = {}
+            self._resync()
+
+    def disconnect(self):
+        with self.lock:
+            if self.sock is not None:
+                try:
+                    self.sock.close()
+                except OSError:
+                    pass
+            self.sock = None
+            self.reader = None
+
+    def ensure_connected(self):
+        # Connects with exponential backoff. The lock is only held while connecting,
+        # never while waiting, so an unreachable load does not block other threads.
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            with self.lock:
+                if self.sock is not None:
+                    return
+                try:
+                    self.connect()
+                    return
+                except OSError:
+                    self.stats["errors"] += 1
+                    if attempt == self.max_retries:
+                        raise
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    def _peer_closed(self):
+        # True when the load closed the connection while it was idle.
+        readable, _, _ = select.select([self.sock], [], [], 0)
+        if not readable:
+            return False
+        try:
+            return self.sock.recv(1, socket.MSG_PEEK) == b""
+        except OSError:
+            return True
 
     def send_command(self, command, expect_response=True):
-        full_command = command + '\n'  # Add newline as per protocol
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.connect((self.ip, self.port))
-            s.sendall(full_command.encode())
-            if expect_response:
-                return s.recv(1024).decode().strip()
-        return None
+        # A command that could not be sent is retried once on a fresh connection. Once it
+        # has been sent it is never sent again: a lost reply drops the connection and
+        # raises, as the load may already have executed it. Must not be called with the
+        # lock held (the backoff would sleep under it); locked code uses _send.
+        for attempt in range(2):
+            self.ensure_connected()
+            try:
+                return self._send(command, expect_response)
+            except OSError as e:
+                if e.command_sent or attempt == 1:
+                    raise
+
+    def _send(self, command, expect_response=True):
+        # One attempt, never sleeps. Failures carry command_sent, telling whether the
+        # command may have reached the load.
+        full_command = (command + '\n').encode()  # Add newline as per protocol
+        with self.lock:
+            sent = False
+            try:
+                if self.sock is not None and self._peer_closed():
+                    self.disconnect()  # closed by the load while idle
+                if self.sock is None:
+                    self.connect()
+                with STATS.measure(self.name, command) as io:
+                    self.sock.sendall(full_command)
+                    sent = True
+                    io["bytes_out"] = len(full_command)
+                    self._count("commands", 1)
+                    self._count("bytes_sent", len(full_command))
+                    if expect_response:
+                        response = self.reader.read_line()
+                        io["bytes_in"] = len(response) + 1
+                        self._count("bytes_received", len(response) + 1)
+                        return response
+                return None
+            except OSError as e:
+                # Covers timeouts, resets and refused connects: drop the socket.
+                self.stats["errors"] += 1
+                self.disconnect()
+                e.command_sent = sent
+                raise
+
+    def apply_commands(self, commands):
+        # Concatenates the commands into one SCPI message (";:" resets to the root node)
+        # and waits for the single *OPC? confirmation at the end. Commands whose value the
+        # load already holds are left out; if nothing is left there is no round trip at all.
+        self.ensure_connected()
+        with self.lock:
+            changes = self._changes(commands)
+            if not changes:
+                return
+            response = self._send(";:".join([c for c, _, _ in changes] + ["*OPC?"]), expect_response=True)
+            self.cache.clear()
+            if response != "1":
+                for _, key, _ in changes:
+                    self.setpoints.pop(key, None)  # unknown now, never skip the next write
+                raise RuntimeError(f"Load did not confirm command batch (got '{response}').")
+            for _, key, value in changes:
+                self.setpoints[key] = value
+
+    def resync(self):
+        # Reads the real channel, mode and load state back into the shadow registers.
+        self.ensure_connected()
+        with self.lock:
+            self._resync()
+
+    def _resync(self):
+        channel = self._send("CHAN?", expect_response=True).strip()
+        mode = self._send("MODE?", expect_response=True).strip()
+        load = self._send("LOAD:STATe?", expect_response=True).strip()
+        self.setpoints = {"CHAN": channel, (channel, "MODE"): mode, (channel, "LOAD:STATE"): load}
+
+    def _changes(self, commands):
+        # Returns (command, shadow key, value) for every command that changes a set point.
+        channel = self.setpoints.get("CHAN")
+        changes = []
+        for command in commands:
+            header, _, value = command.partition(" ")
+            header = header.upper()
+            key = header if header in GLOBAL_HEADERS else (channel, header)
+            current = self.setpoints.get(key)
+            if current is None or header in UNSKIPPABLE_HEADERS or not same_setting(current, value):
+                changes.append((command, key, value))
+            if header == "CHAN":
+                channel = value
+        return changes
+
+    def set_point(self, command):
+        # Sends a set command unless the shadow register already holds its value.
+        self.ensure_connected()
+        with self.lock:
+            for command, key, value in self._changes([command]):
+                self._send(command, expect_response=False)
+                self.setpoints[key] = value
+
+    def _count(self, key, amount):
+        self.stats[key] += amount
+        self.connection_stats[key] += amount
 
     def remote_on(self):
-        return self.send_command("CONF:REM ON", expect_response=False)
+        return self.set_point("CONF:REM ON")
     
     def remote_off(self):
-        return self.send_command("CONF:REM OFF", expect_response=False)
+        return self.set_point("CONF:REM OFF")
+
+    def query(self, command):
+        return self.cache.get(command, lambda: self.send_command(command, expect_response=True))
 
     def select_channel(self, ch=3):
-        self.send_command(f"CHAN {ch}", expect_response=False)
+        self.set_point(f"CHAN {ch}")
+        self.cache.clear()  # every cached reply belonged to the previous channel
 
     def set_voltage_range_high(self):
-        return self.send_command("CONF:VOLT:RANG H", expect_response=False)
+        return self.set_point("CONF:VOLT:RANG H")
 
     def set_run(self):
         return self.send_command("RUN", expect_response=False)
     
     def set_mode_cch(self):
-        return self.send_command("MODE CCH", expect_response=False)
+        response = self.set_point("MODE CCH")
+        self.cache.invalidate(*MEASUREMENTS)
+        return response
 
     def set_static_current(self, current):
-        self.send_command(f"CURR:STAT:L1 {current}", expect_response=False)
-        self.send_command(f"CURR:STAT:L2 {current}", expect_response=False)
+        self.set_point(f"CURR:STAT:L1 {current}")
+        self.set_point(f"CURR:STAT:L2 {current}")
+        self.cache.invalidate(*MEASUREMENTS)
 
     def set_slew_rate(self, rise, fall):
-        self.send_command(f"CURR:STAT:RISE {rise}", expect_response=False)
-        self.send_command(f"CURR:STAT:FALL {fall}", expect_response=False)
+        self.set_point(f"CURR:STAT:RISE {rise}")
+        self.set_point(f"CURR:STAT:FALL {fall}")
 
     def load_on(self):
-        return self.send_command("LOAD:STATe ON", expect_response=False)
+        response = self.set_point("LOAD:STATe ON")
+        self.cache.invalidate("LOAD:STATe?", *MEASUREMENTS)
+        return response
         
     def load_off(self):
-        return self.send_command("LOAD:STATe OFF", expect_response=False)
+        # Always sent: switching the load off must not depend on a possibly stale shadow.
+        response = self.send_command("LOAD:STATe OFF", expect_response=False)
+        with self.lock:
+            self.setpoints[(self.setpoints.get("CHAN"), "LOAD:STATE")] = "OFF"
+        self.cache.invalidate("LOAD:STATe?", *MEASUREMENTS)
+        return response
 
     def measure_voltage(self):
-        return self.send_command("MEAS:VOLT?", expect_response=True)
+        return self.cache.get("MEAS:VOLT?", lambda: self._measure("MEAS:VOLT?", "voltage"))
 
     def measure_current(self):
-        return self.send_command("MEAS:CURR?", expect_response=True)
+        return self.cache.get("MEAS:CURR?", lambda: self._measure("MEAS:CURR?", "current"))
+
+    def _measure(self, command, quantity):
+        response = self.send_command(command, expect_response=True)
+        self._record(quantity, response)
+        return response
+
+    def _record(self, quantity, response):
+        if self.recorder is not None:
+            try:
+                self.recorder.record(self.name, None, quantity, float(response))
+            except ValueError:
+                pass
     
     def check_load_status(self):
-        response = self.send_command("LOAD:STATe?", expect_response=True)
-        return response.strip() in ["1"]
\ No newline at end of file
+        response = self.query("LOAD:STATe?").strip()
+        with self.lock:
+            if "CHAN" in self.setpoints:
+                self.setpoints[(self.setpoints.get("CHAN"), "LOAD:STATE")] = response
+        return response in ["1"]
\ No newline at end of file
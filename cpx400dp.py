@@ -1,60 +1,288 @@
+import logging
 import socket
-import time
+import threading
 from power_supply_interface import PowerSupplyInterface
+from socket_reader import SocketReader
+from instrumentation import STATS
+from state_cache import StateCache
+
+# How long a reply stays valid, per command type ("V1?" and "V2?" are both "Vn?").
+CACHE_TTLS = {"Vn?": 0.25, "In?": 0.25, "VnO?": 0.25, "InO?": 0.25, "OPn?": 1.0, "*IDN?": 3600.0}
+QUANTITIES = {"V": "voltage", "I": "current"}
+
+# Command traffic is logged at DEBUG; enable with logging.getLogger("cpx400dp").setLevel(logging.DEBUG).
+log = logging.getLogger(__name__)
+
+def parse_reading(response: str) -> float:
+    # Handles both "V1 12.000" (set-point queries) and "12.000V" (readback queries).
+    return float(response.split()[-1].rstrip("VAW"))
 
 class CPX400DP(PowerSupplyInterface):
-    def __init__(self, ip: str, port: int = 9221):
+    def __init__(self, ip: str, port: int = 9221, timeout: float = 2.0, coalesce_window: float = 0.05,
+                 name: str = None):
         self.ip = ip
+        self.name = name or f"CPX400DP-{ip}"
         self.port = port
+        self.timeout = timeout
        
         self.socket = None
-        if "192.168.0.103" in ip:
-            self.name = f"CPX400DP Right {ip}"  # Add this line
-        elif "192.168.0.105" in ip:
-            self.name = f"CPX400DP Left {ip}"  # Add this line
-        else:
-            self.name = f"CPX400DP-{ip}"  # Add this line
+        self.reader = None
+        # Set by connect() and cleared by disconnect(): while set, a connection lost to an
+        # I/O error is reopened by the next command.
+        self.auto_reconnect = False
+        self.recorder = None  # optional MeasurementLogger fed by the read methods
+        # Replies shared by every reader (live poller, Read Values, sweeps).
+        self.cache = StateCache(CACHE_TTLS)
+        # Serialises access to the socket between the live poller and the GUI thread.
+        self.lock = threading.Lock()
+        self.reconnect_lock = threading.Lock()
+
+        # Shadow copies of the last set points written to (or read back from) the PSU, e.g.
+        # {"V1": "12.000", "OP1": "1"}. Writes equal to the shadow are not sent, and writes
+        # arriving within coalesce_window of each other only send their final value.
+        self.setpoints = {}
+        self.coalesce_window = coalesce_window
+        self.pending_writes = {}
+        self.flush_timer = None
+        self.write_lock = threading.RLock()
 
     def connect(self):
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.connect((self.ip, self.port))
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.connect((self.ip, self.port))
+        with self.lock:
+            if self.socket:
+                self.socket.close()
+            self.socket = sock
+            self.reader = SocketReader(sock)
+            self.auto_reconnect = True
+        self.cache.clear()
         print(f"Connected to {self.ip}:{self.port}")
+        self.resync()
 
     def disconnect(self):
+        try:
+            self.flush()
+        except OSError as e:
+            print(f"[{self.ip}] pending writes lost: {e}")
+        with self.lock:
+            self.auto_reconnect = False
+            if self.socket:
+                self.socket.close()
+                self.socket = None
+                self.reader = None
+                print(f"Disconnected from {self.ip}")
+        self.cache.clear()
+
+    def _drop_connection(self):
+        # Called with the lock held after an I/O error: the socket is dead or its reply
+        # stream is out of step, so it is closed and the next command reconnects.
         if self.socket:
-            self.socket.close()
-            self.socket = None
-            print(f"Disconnected from {self.ip}")
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+        self.socket = None
+        self.reader = None
+        self.cache.clear()
+
+    def _ensure_synchronized(self):
+        # A query that timed out leaves its reply in flight, and an I/O error drops the
+        # connection; either way open a new one rather than reuse the old stream.
+        reader = self.reader
+        if reader is not None and not reader.desynchronized:
+            return
+        if reader is None and not self.auto_reconnect:
+            return  # never connected, or disconnected on purpose
+        with self.reconnect_lock:
+            if self.reader is reader and self.auto_reconnect:  # not already replaced by another thread
+                print(f"[{self.ip}] reconnecting")
+                STATS.record_reconnect(self.name)
+                self.connect()
 
     def send_command(self, command: str, expect_response: bool = False):
-        if not self.socket:
-            raise ConnectionError("Not connected to device.")
-        print(f"[{self.ip}] >> {command}")
-        self.socket.send((command + '\n').encode())
-        if expect_response:
-            time.sleep(0.1)
-            response = self.socket.recv(1024).decode().strip()
-            print(f"[{self.ip}] << {response}")
-            return response
+        self._ensure_synchronized()
+        with self.lock:
+            if not self.socket:
+                raise ConnectionError("Not connected to device.")
+            log.debug("[%s] >> %s", self.ip, command)
+            payload = (command + '\n').encode()
+            try:
+                with STATS.measure(self.name, command) as io:
+                    self.socket.sendall(payload)
+                    io["bytes_out"] = len(payload)
+                    if expect_response:
+                        response = self._read_response()
+                        io["bytes_in"] = len(response) + 1
+                        log.debug("[%s] << %s", self.ip, response)
+                        return response
+            except OSError:
+                self._drop_connection()
+                raise
         return None
 
+    def query_many(self, commands):
+        # Pipelines all queries in a single write and reads the replies back in order.
+        self._ensure_synchronized()
+        with self.lock:
+            if not self.socket:
+                raise ConnectionError("Not connected to device.")
+            log.debug("[%s] >> %s", self.ip, "; ".join(commands))
+            payload = "".join(command + '\n' for command in commands).encode()
+            try:
+                with STATS.measure(self.name, commands[0] if len(commands) == 1 else "batch") as io:
+                    self.socket.sendall(payload)
+                    io["bytes_out"] = len(payload)
+                    responses = [self._read_response() for _ in commands]
+                    io["bytes_in"] = sum(len(r) + 1 for r in responses)
+            except OSError:
+                self._drop_connection()
+                raise
+            log.debug("[%s] << %s", self.ip, "; ".join(responses))
+            return responses
+
+    def write_many(self, commands):
+        # Several set commands in a single write, no replies expected.
+        self._ensure_synchronized()
+        with self.lock:
+            if not self.socket:
+                raise ConnectionError("Not connected to device.")
+            log.debug("[%s] >> %s", self.ip, "; ".join(commands))
+            payload = "".join(command + '\n' for command in commands).encode()
+            try:
+                with STATS.measure(self.name, commands[0] if len(commands) == 1 else "batch") as io:
+                    self.socket.sendall(payload)
+                    io["bytes_out"] = len(payload)
+            except OSError:
+                self._drop_connection()
+                raise
+
+    def _read_response(self):
+        return self.reader.read_line()
+
     def get_id(self):
-        return self.send_command("*IDN?", expect_response=True)
+        return self.cache.get("*IDN?", lambda: self.send_command("*IDN?", expect_response=True))
+
+    def resync(self):
+        # Re-reads the real set points, e.g. after a reconnect or a front panel change.
+        with self.write_lock:
+            self._cancel_flush()
+            self.pending_writes.clear()
+            commands = ["V1?", "I1?", "V2?", "I2?", "OP1?", "OP2?"]
+            responses = self.query_many(commands)
+            self.setpoints = {}
+            for command, response in zip(commands, responses):
+                header = command[:-1]
+                if header.startswith("OP"):
+                    self.setpoints[header] = response.strip()
+                else:
+                    self.setpoints[header] = f"{parse_reading(response):.3f}"
+
+    def _write_setpoint(self, header, value):
+        with self.write_lock:
+            if value == self.setpoints.get(header):
+                # Back at the confirmed value: nothing to send, drop any queued change.
+                self.pending_writes.pop(header, None)
+                return
+            self.pending_writes[header] = value
+            if self.coalesce_window <= 0:
+                self.flush()
+            elif self.flush_timer is None:
+                self.flush_timer = threading.Timer(self.coalesce_window, self._timed_flush)
+                self.flush_timer.daemon = True
+                self.flush_timer.start()
+
+    def _cancel_flush(self):
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        except OSError as e:
+            print(f"[{self.ip}] failed to write set points: {e}")
+
+    def flush(self):
+        # Sends every queued set point (final values only) in one write.
+        with self.write_lock:
+            self._cancel_flush()
+            writes = self.pending_writes
+            self.pending_writes = {}
+            if not writes:
+                return
+            try:
+                self.write_many([f"{header} {value}" for header, value in writes.items()])
+            except OSError:
+                for header in writes:
+                    self.setpoints.pop(header, None)  # unknown now, never skip the next write
+                raise
+            finally:
+                for header in writes:
+                    ch = header[-1]
+                    self.cache.invalidate(f"{header}?", f"V{ch}O?", f"I{ch}O?")
+            self.setpoints.update(writes)
 
     def set_voltage(self, channel: int, voltage: float):
-        self.send_command(f"V{channel} {voltage:.3f}")
+        self._write_setpoint(f"V{channel}", f"{voltage:.3f}")
 
     def set_current(self, channel: int, current: float):
-        self.send_command(f"I{channel} {current:.3f}")
+        self._write_setpoint(f"I{channel}", f"{current:.3f}")
 
     def output_on(self, channel: int):
-        self.send_command(f"OP{channel} 1")
+        self._write_setpoint(f"OP{channel}", "1")
 
     def output_off(self, channel: int):
-        self.send_command(f"OP{channel} 0")
+        # Always sent at once and never skipped: switching an output off must not depend on
+        # a possibly stale shadow or a flush timer, and a failure must reach the caller.
+        header = f"OP{channel}"
+        with self.write_lock:
+            self.pending_writes.pop(header, None)
+            try:
+                self.write_many([f"{header} 0"])
+            except OSError:
+                self.setpoints.pop(header, None)
+                raise
+            finally:
+                self.cache.invalidate(f"{header}?", f"V{channel}O?", f"I{channel}O?")
+            self.setpoints[header] = "0"
+
+    def output_enabled(self):
+        # From the shadow registers, so it costs no I/O.
+        return any(self.setpoints.get(f"OP{ch}") == "1" for ch in (1, 2))
+
+    def query(self, command: str):
+        # Cached single query; the reply is recorded only when it really came from the PSU.
+        return self.cache.get(command, lambda: self._fetch_many([command])[0])
 
     def read_voltage(self, channel: int):
-        return self.send_command(f"V{channel}?", expect_response=True)
+        return self.query(f"V{channel}?")
 
     def read_current(self, channel: int):
-        return self.send_command(f"I{channel}?", expect_response=True)
+        return self.query(f"I{channel}?")
+
+    def read_all(self, channels=(1, 2)):
+        commands = []
+        for ch in channels:
+            commands += [f"V{ch}?", f"I{ch}?"]
+        values = [parse_reading(r) for r in self.cache.get_many(commands, self._fetch_many)]
+        return {ch: (values[2 * n], values[2 * n + 1]) for n, ch in enumerate(channels)}
+
+    def _fetch_many(self, commands):
+        responses = self.query_many(commands)
+        if self.recorder is not None:
+            for command, response in zip(commands, responses):
+                self._record(command, response)
+        return responses
+
+    def _record(self, command, response):
+        # Only V<ch>? / I<ch>? style queries are measurements worth logging.
+        quantity = QUANTITIES.get(command[:1])
+        channel = command[1:].rstrip("?O")
+        if quantity is None or not channel.isdigit():
+            return
+        try:
+            self.recorder.record(self.name, int(channel), quantity, parse_reading(response))
+        except (ValueError, IndexError):
+            pass
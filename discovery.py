@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+from instrument_registry import InstrumentRegistry
+
+# Port each instrument family listens on, and the *IDN? fragment that identifies it.
+PORTS = (9221, 5025, 5000)
+IDENTIFIERS = [
+    ("CPX400", "psus"),
+    ("DMM6500", "dmms"),
+    ("CHROMA", "loads"),
+]
+
+
+def identify(idn):
+    # "THURLBY THANDAR, CPX400DP, ..." -> "psus"; None for instruments we have no driver for.
+    upper = idn.upper()
+    for fragment, kind in IDENTIFIERS:
+        if fragment in upper:
+            return kind
+    return None
+
+
+async def probe(ip, port, timeout, limit):
+    # Returns the *IDN? reply of ip:port, or None when nothing answers in time.
+    async with limit:
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        try:
+            writer.write(b"*IDN?\n")
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readuntil(b"\n"), timeout)
+            return line.decode(errors="replace").strip()
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return None
+        finally:
+            writer.close()
+
+
+async def scan(subnet, ports=PORTS, timeout=0.3, concurrency=512):
+    # Probes every host/port pair of the subnet at once (bounded by concurrency), so a
+    # /24 takes a few timeouts instead of 254 * len(ports) of them.
+    limit = asyncio.Semaphore(concurrency)
+    targets = [(str(ip), port) for ip in ipaddress.ip_network(subnet, strict=False).hosts() for port in ports]
+    replies = await asyncio.gather(*(probe(ip, port, timeout, limit) for ip, port in targets))
+    devices = []
+    for (ip, port), idn in zip(targets, replies):
+        if idn:
+            devices.append({"ip": ip, "port": port, "idn": idn, "kind": identify(idn)})
+    return devices
+
+
+def discover(subnet, ports=PORTS, timeout=0.3, concurrency=512):
+    return asyncio.run(scan(subnet, ports, timeout, concurrency))
+
+
+def bench_config(devices, base=None):
+    # Bench config (see bench.json) with one entry per identified device, named after
+    # the model and address. Settings such as poll_workers are kept from base.
+    config = {key: value for key, value in (base or {}).items() if key not in ("psus", "dmms", "loads")}
+    for kind in ("psus", "dmms", "loads"):
+        config[kind] = []
+    for device in devices:
+        if device["kind"] is None:
+            continue
+        fields = [f.strip() for f in device["idn"].split(",")]
+        model = fields[1] if len(fields) > 1 and fields[1] else fields[0]
+        model = model.replace("MODEL ", "")
+        config[device["kind"]].append({"name": f"{model} {device['ip']}", "ip": device["ip"], "port": device["port"]})
+    return config
+
+
+def merge_config(devices, config):
+    # Adds the identified devices that config does not list yet (same ip and port) and
+    # keeps everything else, including the names and settings of known instruments.
+    merged = dict(config)
+    known = {(entry["ip"], entry.get("port")) for kind in ("psus", "dmms", "loads") for entry in config.get(kind, [])}
+    found = bench_config(devices)
+    for kind in ("psus", "dmms", "loads"):
+        new = [entry for entry in found[kind] if (entry["ip"], entry["port"]) not in known
+               and (entry["ip"], None) not in known]
+        merged[kind] = list(config.get(kind, [])) + new
+    return merged
+
+
+def discover_registry(subnet, base=None, **kwargs):
+    return InstrumentRegistry(bench_config(discover(subnet, **kwargs), base))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find lab instruments on a subnet with *IDN?.")
+    parser.add_argument("subnet", help="e.g. 192.168.0.0/24")
+    parser.add_argument("--timeout", type=float, default=0.3, help="connect and reply timeout per probe")
+    parser.add_argument("--write", help="add the instruments found to this bench config (created if missing)")
+    args = parser.parse_args()
+
+    devices = discover(args.subnet, timeout=args.timeout)
+    for device in devices:
+        print(f"{device['ip']}:{device['port']}  {device['kind'] or 'unknown':6}  {device['idn']}")
+    if args.write:
+        config = {}
+        if os.path.exists(args.write):
+            with open(args.write, encoding="utf-8") as f:
+                config = json.load(f)
+        with open(args.write, "w", encoding="utf-8") as f:
+            json.dump(merge_config(devices, config), f, indent=4)
+        print(f"Bench config written to {args.write}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import time
+import numpy as np
+
+FUNCTIONS = {
+    "Voltage": "VOLT:DC",
+    "Current": "CURR:DC",
+    "Resistance": "RES",
+}
+
+QUANTITIES = {"VOLT": "voltage", "CURR": "current", "RES": "resistance"}
+
+def read_buffer(dmm, start, end, buffer="defbuffer1"):
+    # Fetches readings and relative timestamps from the instrument reading buffer as
+    # binary doubles instead of ASCII. Returns (relative_times, readings) arrays.
+    if end < start:
+        empty = np.empty(0)
+        return empty, empty
+    with dmm.lock:
+        dmm.send_command("FORM:DATA REAL")
+        try:
+            data = dmm.query_block(f'TRAC:DATA? {start}, {end}, "{buffer}", READ, REL')
+        finally:
+            # MEAS? and READ? replies follow FORM:DATA too, keep them ASCII for the GUI.
+            dmm.send_command("FORM:DATA ASC")
+    pairs = np.frombuffer(data, dtype="<f8").reshape(-1, 2)
+    return pairs[:, 1].copy(), pairs[:, 0].copy()
+
+
+# Settings queried and set with the reading buffer as an extra argument.
+BUFFER_SETTINGS = ("TRAC:POIN", "TRAC:FILL:MODE")
+
+
+def save_settings(dmm, headers, buffer="defbuffer1"):
+    # Reads the given settings and returns the commands that put them back, in the same
+    # order, for restore_settings. "FUNC" stands for the measure (or digitize) function;
+    # list it last, as settings such as VOLT:DC:NPLC belong to a function.
+    commands = []
+    for header in headers:
+        if header == "FUNC":
+            function = dmm.query("SENS:FUNC?").strip().strip('"')
+            if function.upper() == "NONE":  # the DMM was digitizing
+                commands.append('DIG:FUNC "' + dmm.query("DIG:FUNC?").strip().strip('"') + '"')
+            else:
+                commands.append(f'SENS:FUNC "{function}"')
+        elif header in BUFFER_SETTINGS:
+            value = dmm.query(f'{header}? "{buffer}"').strip()
+            commands.append(f'{header} {value}, "{buffer}"')
+        else:
+            commands.append(f"{header} {dmm.query(header + '?').strip()}")
+    return commands
+
+
+def restore_settings(dmm, commands):
+    for command in commands:
+        dmm.send_command(command)
+
+
+def configure_block(dmm, function="VOLT:DC", count=10, nplc=1, buffer="defbuffer1"):
+    # Sets the DMM up so measure_block can take `count` readings with a single trigger.
+    for command in [
+        f'SENS:FUNC "{function}"',
+        f"{function}:NPLC {nplc}",
+        f"SENS:COUN {count}",
+        f'TRAC:POIN {max(count, 10)}, "{buffer}"',
+    ]:
+        dmm.send_command(command)
+
+
+def measure_block(dmm, count, buffer="defbuffer1"):
+    # Takes `count` readings into the buffer and fetches them in one binary transfer.
+    with dmm.lock:
+        dmm.send_command(f'TRAC:CLE "{buffer}"')
+        dmm.send_command(f'TRAC:TRIG "{buffer}"')
+        dmm.query("*OPC?")
+        return read_buffer(dmm, 1, count, buffer)
+
+
+class DMMStream:
+    # Continuous high-rate acquisition: the trigger model measures into a circular
+    # reading buffer and fetch() pulls whatever arrived since the previous call.
+    # Measurement settings the stream changes are read first and put back by stop(),
+    # so the front panel configuration survives a stream.
+    def __init__(self, dmm, function="VOLT:DC", nplc=0.01, capacity=100000, buffer="defbuffer1"):
+        self.dmm = dmm
+        self.function = function
+        self.nplc = nplc
+        self.capacity = capacity
+        self.buffer = buffer
+        self.next_index = 1
+        self.start_time = None
+        self.running = False
+        self.saved = []  # restore commands sent by stop()
+
+    def configure(self):
+        f = self.function
+        for command in [
+            f'SENS:FUNC "{f}"',
+            f"{f}:RANG:AUTO OFF",
+            f"{f}:NPLC {self.nplc}",
+            f"{f}:AZER OFF",
+            "DISP:LIGH:STAT OFF",  # screen updates cost measurement time
+            f'TRAC:POIN {self.capacity}, "{self.buffer}"',
+            f'TRAC:FILL:MODE CONT, "{self.buffer}"',
+            'TRIG:LOAD "Empty"',
+            f'TRIG:BLOC:BUF:CLE 1, "{self.buffer}"',
+            f'TRIG:BLOC:MDIG 2, "{self.buffer}", INF',
+        ]:
+            self.dmm.send_command(command)
+
+    def start(self):
+        f = self.function
+        self.saved = save_settings(self.dmm, [f"{f}:RANG:AUTO", f"{f}:AZER", f"{f}:NPLC", "DISP:LIGH:STAT",
+                                              "TRAC:POIN", "TRAC:FILL:MODE", "FUNC"], self.buffer)
+        self.configure()
+        self.next_index = 1
+        self.dmm.send_command("INIT")
+        self.start_time = time.time()
+        self.running = True
+
+    def stop(self):
+        if self.running:
+            self.dmm.send_command("ABOR")
+            self.dmm.send_command('TRIG:LOAD "Empty"')
+            restore_settings(self.dmm, self.saved)
+            self.running = False
+
+    def fetch(self):
+        # Returns (timestamps, readings) for all samples acquired since the last fetch.
+        end = int(float(self.dmm.query(f'TRAC:ACT:END? "{self.buffer}"')))
+        if end == 0 or end == self.next_index - 1:
+            empty = np.empty(0)
+            return empty, empty
+        if end >= self.next_index:
+            rel, values = read_buffer(self.dmm, self.next_index, end, self.buffer)
+        else:
+            # The circular buffer wrapped since the last fetch.
+            rel_a, values_a = read_buffer(self.dmm, self.next_index, self.capacity, self.buffer)
+            rel_b, values_b = read_buffer(self.dmm, 1, end, self.buffer)
+            rel, values = np.concatenate((rel_a, rel_b)), np.concatenate((values_a, values_b))
+        self.next_index = end % self.capacity + 1
+        times = self.start_time + rel
+        if self.dmm.recorder is not None:
+            quantity = QUANTITIES[self.function.split(":")[0]]
+            self.dmm.recorder.record_block(self.dmm.name, None, quantity, times, values)
+        return times, values
+
+    def read_block(self, count, poll_interval=0.05, timeout=10.0):
+        # Collects exactly `count` samples from a running stream.
+        times, values = [], []
+        collected = 0
+        deadline = time.monotonic() + timeout
+        while collected < count:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Only {collected} of {count} samples acquired.")
+            t, v = self.fetch()
+            times.append(t)
+            values.append(v)
+            collected += len(v)
+            if collected < count:
+                time.sleep(poll_interval)
+        return np.concatenate(times)[:count], np.concatenate(values)[:count]
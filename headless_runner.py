@@ -0,0 +1,241 @@
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+from cpx400dp import parse_reading
+from dmm_acquisition import DMMStream
+from instrument_registry import InstrumentRegistry
+from load_profiles import load_profiles
+
+# Runs test sequences against the same drivers as the GUI, without Tk. Every station
+# (one bench config, optionally with an STK500) gets its own worker thread and tests
+# its DUTs one after the other; each DUT result is appended to a JSON lines file.
+#
+# A sequence file holds "steps" and optional "cleanup" steps, which run after every
+# DUT even when a step failed:
+#   {"step": "psu", "psu": "PSU Left", "channel": 1, "voltage": 12, "current": 1, "output": true}
+#   {"step": "profile", "load": "Chroma", "profile": "Pump"}
+#   {"step": "load_off", "load": "Chroma"}
+#   {"step": "stk500", "values": {"Pump_dhw_manual_request": 1}}
+#   {"step": "wait", "seconds": 0.5}
+#   {"step": "measure", "instrument": "DMM", "quantity": "voltage", "name": "vout", "min": 11.5, "max": 12.5}
+#   {"step": "stream", "instrument": "DMM", "samples": 5000, "statistic": "pp", "name": "ripple", "max": 0.05}
+# "measure" reads a PSU ("channel" required), DMM or load; the limits are optional.
+# "stream" takes "samples" fast DMM readings ("function" and "nplc" optional) and
+# checks one statistic of them: mean, std, min, max or pp (peak to peak).
+
+PSU_READS = {"voltage": "V{}O?", "current": "I{}O?"}
+DMM_READS = {"voltage": "read_voltage", "resistance": "read_resistance", "continuity": "read_continuity"}
+LOAD_READS = {"voltage": "measure_voltage", "current": "measure_current"}
+STATISTICS = {"mean": np.mean, "std": np.std, "min": np.min, "max": np.max, "pp": np.ptp}
+
+
+class StepError(Exception):
+    pass
+
+
+class Station:
+    def __init__(self, name, registry, profiles, stk500_port=None, duts=()):
+        self.name = name
+        self.registry = registry
+        self.profiles = {profile.name: profile for profile in profiles}
+        self.stk500_port = stk500_port
+        self.stk500 = None
+        self.duts = list(duts)
+
+    def open(self):
+        errors = self.registry.connect_all(("psus", "dmms", "loads"))
+        if errors:
+            raise StepError(", ".join(f"{name}: {e}" for name, e in errors.items()))
+        if self.stk500_port:
+            # Imported here so stations without an STK500 do not need the stk500 package.
+            from SerialConnection import Stk500Controller, ComplexSdfProvider
+            self.stk500 = Stk500Controller(com_port=self.stk500_port, sdf_provider_class=ComplexSdfProvider)
+
+    def close(self):
+        for psu in self.registry.psus.values():
+            try:
+                psu.disconnect()
+            except OSError:
+                pass
+        for dmm in self.registry.dmms.values():
+            dmm.close()
+        for chroma in self.registry.loads.values():
+            chroma.disconnect()
+
+    def instrument(self, kind, name):
+        try:
+            return self.registry.instruments[kind][name]
+        except KeyError:
+            raise StepError(f"No {kind[:-1]} named '{name}' on station {self.name}.") from None
+
+    def run_step(self, step):
+        # Returns the measured value for "measure" steps, None otherwise.
+        kind = step["step"]
+        if kind == "psu":
+            psu = self.instrument("psus", step["psu"])
+            ch = step["channel"]
+            if "voltage" in step:
+                psu.set_voltage(ch, step["voltage"])
+            if "current" in step:
+                psu.set_current(ch, step["current"])
+            if step.get("output") is True:
+                psu.output_on(ch)
+            elif step.get("output") is False:
+                psu.output_off(ch)
+            psu.flush()
+        elif kind == "profile":
+            profile = self.profiles.get(step["profile"])
+            if profile is None:
+                raise StepError(f"Unknown load profile '{step['profile']}'.")
+            profile.apply(self.instrument("loads", step["load"]))
+        elif kind == "load_off":
+            self.instrument("loads", step["load"]).load_off()
+        elif kind == "stk500":
+            if self.stk500 is None:
+                raise StepError(f"Station {self.name} has no STK500.")
+            self.stk500.write_values(step["values"])
+        elif kind == "wait":
+            time.sleep(step["seconds"])
+        elif kind == "measure":
+            return self.measure(step)
+        elif kind == "stream":
+            return self.stream(step)
+        else:
+            raise StepError(f"Unknown step '{kind}'.")
+        return None
+
+    def measure(self, step):
+        name, quantity = step["instrument"], step["quantity"]
+        if name in self.registry.psus:
+            command = PSU_READS[quantity].format(step["channel"])
+            return parse_reading(self.registry.psus[name].query_many([command])[0])
+        if name in self.registry.dmms:
+            return getattr(self.registry.dmms[name], DMM_READS[quantity])()
+        if name in self.registry.loads:
+            return float(getattr(self.registry.loads[name], LOAD_READS[quantity])())
+        raise StepError(f"No instrument named '{name}' on station {self.name}.")
+
+    def stream(self, step):
+        statistic = STATISTICS.get(step.get("statistic", "mean"))
+        if statistic is None:
+            raise StepError(f"Unknown statistic '{step['statistic']}'.")
+        dmm = self.instrument("dmms", step["instrument"])
+        stream = DMMStream(dmm, step.get("function", "VOLT:DC"), step.get("nplc", 0.01))
+        stream.start()
+        try:
+            _, values = stream.read_block(step["samples"])
+        finally:
+            stream.stop()
+        return float(statistic(values))
+
+    def test(self, dut, steps, cleanup):
+        result = {"station": self.name, "dut": dut, "started": time.time(), "passed": True, "steps": []}
+        started = time.perf_counter()
+        for step in steps:
+            entry = self.execute(step)
+            result["steps"].append(entry)
+            if not entry["passed"]:
+                result["passed"] = False
+                break  # later steps usually depend on this one
+        for step in cleanup:
+            entry = self.execute(step)
+            entry["cleanup"] = True
+            result["steps"].append(entry)
+        result["duration"] = time.perf_counter() - started
+        return result
+
+    def execute(self, step):
+        entry = {"step": step["step"], "passed": True}
+        if "name" in step:
+            entry["name"] = step["name"]
+        try:
+            value = self.run_step(step)
+        except Exception as e:
+            entry.update(passed=False, error=f"{type(e).__name__}: {e}")
+            return entry
+        if value is not None:
+            entry["value"] = value
+            low, high = step.get("min"), step.get("max")
+            entry["passed"] = (low is None or value >= low) and (high is None or value <= high)
+        return entry
+
+
+class ResultWriter:
+    # Appends one JSON line per DUT; shared by all station threads.
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+
+    def write(self, result):
+        line = json.dumps(result) + "\n"
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def run_station(station, steps, cleanup, writer):
+    summary = {"station": station.name, "passed": 0, "failed": 0}
+    try:
+        station.open()
+        for dut in station.duts:
+            result = station.test(dut, steps, cleanup)
+            writer.write(result)
+            summary["passed" if result["passed"] else "failed"] += 1
+            print(f"[{station.name}] {dut}: {'PASS' if result['passed'] else 'FAIL'} ({result['duration']:.2f} s)")
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        station.close()
+    return summary
+
+
+def load_stations(path, count):
+    # Stations file: {"stations": [{"name": ..., "bench": <bench config or path>,
+    # "stk500_port": "COM9", "duts": ["SN001", ...]}]}. Without one, bench.json is a
+    # single station testing `count` DUTs.
+    profiles = load_profiles()
+    if path is None:
+        registry = InstrumentRegistry.from_file()
+        return [Station("bench", registry, profiles, duts=[f"DUT{n + 1:04d}" for n in range(count)])]
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    stations = []
+    for entry in config["stations"]:
+        bench = entry.get("bench")
+        registry = InstrumentRegistry(bench) if isinstance(bench, dict) else InstrumentRegistry.from_file(bench)
+        duts = entry.get("duts") or [f"{entry['name']}-{n + 1:04d}" for n in range(count)]
+        stations.append(Station(entry["name"], registry, profiles, entry.get("stk500_port"), duts))
+    return stations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a test sequence on one or more stations without the GUI.")
+    parser.add_argument("sequence", help="sequence JSON file")
+    parser.add_argument("--stations", help="stations JSON file (default: bench.json as one station)")
+    parser.add_argument("--count", type=int, default=1, help="DUTs per station when no serials are given")
+    parser.add_argument("--output", default="results.jsonl", help="JSON lines file the DUT results are appended to")
+    args = parser.parse_args()
+
+    with open(args.sequence, encoding="utf-8") as f:
+        sequence = json.load(f)
+    stations = load_stations(args.stations, args.count)
+    writer = ResultWriter(args.output)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(stations), thread_name_prefix="station") as pool:
+        summaries = list(pool.map(
+            lambda station: run_station(station, sequence["steps"], sequence.get("cleanup", []), writer), stations))
+    elapsed = time.perf_counter() - started
+
+    tested = sum(s["passed"] + s["failed"] for s in summaries)
+    for s in summaries:
+        line = f"{s['station']}: {s['passed']} passed, {s['failed']} failed"
+        print(line + (f" (station error: {s['error']})" if "error" in s else ""))
+    print(f"{tested} DUTs in {elapsed:.1f} s ({tested / elapsed * 3600:.0f} per hour), results in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from cpx400dp import CPX400DP
+from keithleyDMM6500 import DMM6500
+from chroma_load import ChromaLoad
+
+# Config section -> driver class. Every entry needs an "ip"; "name", "port" and the
+# other keyword arguments of the driver are optional.
+DRIVERS = {"psus": CPX400DP, "dmms": DMM6500, "loads": ChromaLoad}
+
+# (active, idle) poll intervals in seconds when the config has no "polling" rates for them.
+DEFAULT_RATES = {"readings": (0.5, 2.0), "measurement": (0.5, 2.0), "state": (1.0, 5.0)}
+
+def get_config_path():
+    if hasattr(sys, '_MEIPASS'):
+        # Running inside PyInstaller bundle
+        base_path = Path(sys._MEIPASS)
+    else:
+        base_path = Path(__file__).parent.resolve()
+    return base_path / 'bench.json'
+
+
+class InstrumentRegistry:
+    # The instruments of one bench, built from a JSON config such as bench.json.
+    def __init__(self, config):
+        self.config = config
+        self.poll_workers = int(config.get("poll_workers", 4))
+        self.columns = int(config.get("columns", 4))
+        self.polling = config.get("polling", {})
+        self.instruments = {kind: {} for kind in DRIVERS}
+        self.errors = {}  # {name: exception} for instruments that could not be connected
+        for kind in DRIVERS:
+            for spec in config.get(kind, []):
+                self.add(kind, spec)
+
+    @classmethod
+    def from_file(cls, path=None):
+        with open(path or get_config_path(), encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def add(self, kind, spec):
+        spec = dict(spec)
+        if "ip" not in spec:
+            raise ValueError(f"{kind} entry {spec} has no 'ip'.")
+        driver = DRIVERS[kind]
+        name = spec.pop("name", None) or f"{driver.__name__}-{spec['ip']}"
+        if any(name in instruments for instruments in self.instruments.values()):
+            raise ValueError(f"Instrument name '{name}' is used twice.")
+        # Constructing a driver does no I/O; connect_all() opens the connections.
+        self.instruments[kind][name] = driver(name=name, **spec)
+
+    def connect_all(self, kinds=("dmms", "loads"), max_workers=16):
+        # Connects the given kinds of instruments in parallel, so the slowest (or an
+        # unreachable) instrument sets the total time instead of the sum of all of them.
+        # PSUs are left to their panels' Connect buttons by default. Returns the
+        # {name: exception} of instruments that failed; the rest of the bench still works.
+        targets = {name: instrument for kind in kinds for name, instrument in self.instruments[kind].items()}
+        if not targets:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(targets)), thread_name_prefix="connect") as pool:
+            futures = {name: pool.submit(instrument.connect) for name, instrument in targets.items()}
+        errors = {name: f.exception() for name, f in futures.items() if f.exception() is not None}
+        for name in targets:
+            self.errors.pop(name, None)
+        self.errors.update(errors)
+        return errors
+
+    def poll_rates(self, instrument, quantity):
+        # (active, idle) intervals for one instrument's poll job. polling.rates in the
+        # config is searched for "instrument/quantity", the instrument, the quantity
+        # and finally "default", e.g. {"Chroma/state": {"active": 0.5, "idle": 10}}.
+        rates = self.polling.get("rates", {})
+        for key in (f"{instrument}/{quantity}", instrument, quantity, "default"):
+            if key in rates:
+                active = rates[key].get("active", 0.5)
+                return active, rates[key].get("idle", active)
+        return DEFAULT_RATES.get(quantity, (0.5, 2.0))
+
+    def scheduler_options(self):
+        # Keyword arguments for PollScheduler.
+        return {
+            "max_workers": self.poll_workers,
+            "io_budget": self.polling.get("io_budget"),
+            "max_backoff": self.polling.get("max_backoff", 30.0),
+            "breaker_threshold": self.polling.get("breaker_threshold", 3),
+        }
+
+    @property
+    def psus(self):
+        return self.instruments["psus"]
+
+    @property
+    def dmms(self):
+        return self.instruments["dmms"]
+
+    @property
+    def loads(self):
+        return self.instruments["loads"]
@@ -0,0 +1,120 @@
+import bisect
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency histogram bucket upper bounds: 10 us .. ~20 s, four buckets per doubling.
+BUCKETS = [1e-5 * 2 ** (n / 4) for n in range(84)]
+
+
+def command_type(command: str) -> str:
+    # "V1 12.000" -> "Vn", "MEAS:VOLT:DC?" -> "MEAS:VOLT:DC?", concatenated writes -> "batch".
+    if ";" in command or "\n" in command.strip():
+        return "batch"
+    header = command.strip().split(" ")[0]
+    return re.sub(r"\d+", "n", header)
+
+
+class CommandStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+    def add(self, latency, bytes_out, bytes_in, error):
+        self.count += 1
+        self.bytes_out += bytes_out
+        self.bytes_in += bytes_in
+        self.total_time += latency
+        self.max_time = max(self.max_time, latency)
+        self.histogram[bisect.bisect_left(BUCKETS, latency)] += 1
+        if error is not None:
+            self.errors += 1
+            if isinstance(error, TimeoutError):
+                self.timeouts += 1
+
+    def percentile(self, p):
+        # Upper bound of the bucket holding the p-th percentile sample.
+        if self.count == 0:
+            return None
+        target = self.count * p / 100
+        seen = 0
+        for index, n in enumerate(self.histogram):
+            seen += n
+            if seen >= target and n:
+                return min(BUCKETS[index], self.max_time) if index < len(BUCKETS) else self.max_time
+        return self.max_time
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "mean_ms": self.total_time / self.count * 1000 if self.count else None,
+            "p50_ms": self.percentile(50) * 1000 if self.count else None,
+            "p99_ms": self.percentile(99) * 1000 if self.count else None,
+            "max_ms": self.max_time * 1000,
+        }
+
+
+class InstrumentStats:
+    # Process-wide registry every driver reports its traffic to.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.commands = {}  # {(instrument, command type): CommandStats}
+        self.reconnects = {}
+
+    def record(self, instrument, command, latency, bytes_out=0, bytes_in=0, error=None):
+        key = (instrument, command_type(command))
+        with self.lock:
+            stats = self.commands.get(key)
+            if stats is None:
+                stats = self.commands[key] = CommandStats()
+            stats.add(latency, bytes_out, bytes_in, error)
+
+    def record_reconnect(self, instrument):
+        with self.lock:
+            self.reconnects[instrument] = self.reconnects.get(instrument, 0) + 1
+
+    @contextmanager
+    def measure(self, instrument, command):
+        # Times the block; the caller fills in the byte counts on the yielded dict.
+        io = {"bytes_out": 0, "bytes_in": 0}
+        started = time.perf_counter()
+        try:
+            yield io
+        except Exception as e:
+            self.record(instrument, command, time.perf_counter() - started, io["bytes_out"], io["bytes_in"], e)
+            raise
+        self.record(instrument, command, time.perf_counter() - started, io["bytes_out"], io["bytes_in"])
+
+    def snapshot(self):
+        with self.lock:
+            result = {}
+            for (instrument, command), stats in sorted(self.commands.items()):
+                entry = result.setdefault(instrument, {"reconnects": 0, "commands": {}})
+                entry["commands"][command] = stats.summary()
+            for instrument, count in self.reconnects.items():
+                result.setdefault(instrument, {"reconnects": 0, "commands": {}})["reconnects"] = count
+            return result
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": time.time(), "instruments": self.snapshot()}, f, indent=1)
+
+    def reset(self):
+        with self.lock:
+            self.commands.clear()
+            self.reconnects.clear()
+
+
+STATS = InstrumentStats()
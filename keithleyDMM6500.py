@@ -1,38 +1,106 @@
 import socket
+import threading
+from socket_reader import SocketReader
+from instrumentation import STATS
+from state_cache import StateCache
+
+CACHE_TTLS = {"MEAS:VOLT:DC?": 0.1, "MEAS:CURR:DC?": 0.1, "MEAS:RES?": 0.1, "MEAS:CONT?": 0.1}
 
 class DMM6500:
-    def __init__(self, ip: str, port=5025, timeout=2):
+    def __init__(self, ip: str, port=5025, timeout=2, name: str = None):
         self.ip = ip
         self.port = port
         self.timeout = timeout
+        self.name = name or f"DMM6500-{ip}"
         self.sock = None
-        self.connect()
+        self.reader = None
+        self.recorder = None  # optional MeasurementLogger fed by the read methods
+        self.cache = StateCache(CACHE_TTLS)
+        # Shared between the GUI thread and acquisition threads.
+        self.lock = threading.RLock()
 
     def connect(self):
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.settimeout(self.timeout)
-        self.sock.connect((self.ip, self.port))
+        # Called on first use, so constructing the driver never blocks on the network.
+        with self.lock:
+            if self.sock is not None:
+                return
+            sock = socket.create_connection((self.ip, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock = sock
+            self.reader = SocketReader(sock)
+
+    def _write(self, command, io):
+        if self.reader is not None and self.reader.desynchronized:
+            # The reply to a timed-out query may still arrive: start on a fresh connection.
+            self.close()
+        self.connect()
+        full_command = (command + '\n').encode()
+        self.sock.sendall(full_command)
+        io["bytes_out"] = len(full_command)
 
     def send_command(self, command):
-        full_command = command + '\n'
-        self.sock.sendall(full_command.encode())
+        with self.lock, STATS.measure(self.name, command) as io:
+            try:
+                self._write(command, io)
+            except OSError:
+                self.close()  # dead or out of step: the next command reconnects
+                raise
+        # Any configuration change (function, trigger model, buffer) can alter readings.
+        self.cache.clear()
 
     def query(self, command):
-        self.send_command(command)
-        return self.sock.recv(1024).decode().strip()
+        with self.lock, STATS.measure(self.name, command) as io:
+            try:
+                self._write(command, io)
+                response = self.reader.read_line()
+            except OSError:
+                self.close()  # dead or out of step: the next command reconnects
+                raise
+            io["bytes_in"] = len(response) + 1
+            return response
+
+    def query_block(self, command):
+        # Reads an IEEE 488.2 definite length block: #<n><length><data>.
+        with self.lock, STATS.measure(self.name, command) as io:
+            try:
+                self._write(command, io)
+                header = self.reader.read_exact(2)
+                if header[:1] != b"#" or header[1:2] == b"0":
+                    raise ValueError(f"Unexpected block header {header!r} for '{command}'.")
+                digits = int(header[1:2])
+                length = int(self.reader.read_exact(digits))
+                data = self.reader.read_exact(length)
+                self.reader.read_line()  # trailing terminator
+            except OSError:
+                self.close()  # dead or out of step: the next command reconnects
+                raise
+            io["bytes_in"] = 2 + digits + length + 1
+            return data
+
+    def _measure(self, command, quantity):
+        return self.cache.get(command, lambda: self._fetch_measurement(command, quantity))
+
+    def _fetch_measurement(self, command, quantity):
+        value = float(self.query(command))
+        if self.recorder is not None:
+            self.recorder.record(self.name, None, quantity, value)
+        return value
 
     def read_voltage(self):
-        return float(self.query("MEAS:VOLT:DC?"))
+        return self._measure("MEAS:VOLT:DC?", "voltage")
 
     def read_current(self):
-        return float(self.query("MEAS:CURR:DC?"))
+        return self._measure("MEAS:CURR:DC?", "current")
 
     def read_resistance(self):
-        return float(self.query("MEAS:RES?"))
+        return self._measure("MEAS:RES?", "resistance")
     
     def read_continuity(self):
-        return float(self.query("MEAS:CONT?"))
+        return self._measure("MEAS:CONT?", "continuity")
 
     def close(self):
-        if self.sock:
-            self.sock.close()
\ No newline at end of file
+        with self.lock:
+            if self.sock:
+                self.sock.close()
+            self.sock = None
+            self.reader = None
@@ -0,0 +1,87 @@
+import json
+import sys
+from pathlib import Path
+from chroma_load import MODES
+
+# Command root used for the static/dynamic levels and slews of each mode family.
+LEVEL_COMMANDS = {
+    "CCL": "CURR:STAT", "CCH": "CURR:STAT",
+    "CCDL": "CURR:DYN", "CCDH": "CURR:DYN",
+    "CRL": "RES:STAT", "CRH": "RES:STAT",
+    "CV": "VOLT:STAT",
+}
+# Level names each command root accepts; dynamic modes also take the two dwell times.
+LEVEL_NAMES = {
+    "CURR:STAT": ("L1", "L2"), "RES:STAT": ("L1", "L2"), "VOLT:STAT": ("L1", "L2"),
+    "CURR:DYN": ("L1", "L2", "T1", "T2"),
+}
+SLEW_EDGES = ("rise", "fall")
+
+def get_profiles_path():
+    if hasattr(sys, '_MEIPASS'):
+        # Running inside PyInstaller bundle
+        base_path = Path(sys._MEIPASS)
+    else:
+        base_path = Path(__file__).parent.resolve()
+    return base_path / 'profiles'
+
+
+class LoadProfile:
+    def __init__(self, name, channel, mode, levels, slew=None, load=True, remote=True):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {', '.join(MODES)}.")
+        if slew and mode == "CV":
+            raise ValueError("Slew rates are not supported in CV mode.")
+        names = LEVEL_NAMES[LEVEL_COMMANDS[mode]]
+        for level in levels:
+            if level.upper() not in names:
+                raise ValueError(f"Unknown level '{level}' for mode {mode}, expected one of {', '.join(names)}.")
+        for edge in slew or {}:
+            if edge not in SLEW_EDGES:
+                raise ValueError(f"Unknown slew edge '{edge}', expected one of {', '.join(SLEW_EDGES)}.")
+        self.name = name
+        self.channel = int(channel)
+        self.mode = mode
+        self.levels = dict(levels)
+        self.slew = dict(slew or {})
+        self.load = bool(load)
+        self.remote = bool(remote)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        data.setdefault("name", Path(path).stem)
+        return cls(**data)
+
+    def compile(self):
+        root = LEVEL_COMMANDS[self.mode]
+        commands = []
+        if self.remote:
+            commands.append("CONF:REM ON")
+        commands.append(f"CHAN {self.channel}")
+        commands.append(f"MODE {self.mode}")
+        for level, value in self.levels.items():
+            commands.append(f"{root}:{level.upper()} {value}")
+        for edge in SLEW_EDGES:
+            if edge in self.slew:
+                commands.append(f"{root}:{edge.upper()} {self.slew[edge]}")
+        commands.append(f"LOAD:STATe {'ON' if self.load else 'OFF'}")
+        return commands
+
+    def describe(self):
+        levels = ", ".join(f"{k} {v}" for k, v in self.levels.items())
+        slew = "/".join(str(self.slew[e]) for e in SLEW_EDGES if e in self.slew)
+        text = f"CH{self.channel} {self.mode}, {levels}"
+        if slew:
+            text += f", slew {slew}"
+        return text + f", load {'ON' if self.load else 'OFF'}"
+
+    def apply(self, chroma):
+        # Sends the whole profile as one write, confirmed by a single *OPC?.
+        chroma.apply_commands(self.compile())
+
+
+def load_profiles(folder=None):
+    folder = Path(folder) if folder else get_profiles_path()
+    return [LoadProfile.from_file(path) for path in sorted(folder.glob('*.json'))]
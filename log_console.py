@@ -0,0 +1,54 @@
+import logging
+import queue
+import tkinter as tk
+from logging.handlers import RotatingFileHandler
+
+
+class LogConsole:
+    # Read-only log window that any thread may write to. Lines are queued and flushed
+    # to the Text widget in one batch per frame (flush is a RenderScheduler source);
+    # the widget keeps the newest max_lines.
+    def __init__(self, parent, height=10, width=50, max_lines=1000,
+                 log_file=None, max_bytes=1024 * 1024, backup_count=3):
+        self.text = tk.Text(parent, height=height, width=width, state='disabled')
+        self.max_lines = max_lines
+        self.pending = queue.SimpleQueue()
+        self.lines = 0
+
+        # Optional mirror to a rotating file; logging handlers are thread safe.
+        self.logger = None
+        if log_file:
+            self.logger = logging.getLogger(f"console.{log_file}")
+            self.logger.propagate = False
+            self.logger.setLevel(logging.INFO)
+            if not self.logger.handlers:
+                handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self.logger.addHandler(handler)
+
+    def grid(self, **kwargs):
+        self.text.grid(**kwargs)
+
+    def write(self, text):
+        self.pending.put(text)
+        if self.logger is not None:
+            self.logger.info(text)
+
+    def flush(self):
+        lines = []
+        while True:
+            try:
+                lines.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+        if lines:
+            lines = lines[-self.max_lines:]
+            self.text.configure(state='normal')
+            self.text.insert(tk.END, "\n".join(lines) + "\n")
+            self.lines += sum(line.count("\n") + 1 for line in lines)
+            excess = self.lines - self.max_lines
+            if excess > 0:
+                self.text.delete("1.0", f"{excess + 1}.0")
+                self.lines -= excess
+            self.text.see(tk.END)
+            self.text.configure(state='disabled')
@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+import numpy as np
+
+# Fixed-size, unpadded record so files can be memory-mapped straight into NumPy.
+RECORD = np.dtype([("time", "<f8"), ("series", "<u4"), ("value", "<f8")])
+SERIES_FILE = "series.json"
+FILE_PATTERN = "measurements-*.bin"
+
+
+class MeasurementLogger:
+    # Streams samples into append-only binary files. Samples are collected in memory
+    # and written as one chunk (flushed and fsynced), so a crash loses at most the
+    # chunk that was still being collected. Files rotate once they reach max_file_bytes.
+    def __init__(self, directory, chunk_records=1024, flush_interval=1.0, max_file_bytes=64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.chunk_records = chunk_records
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.lock = threading.Lock()
+        self.pending = []
+        self.series_ids = {}
+        self._load_series()
+
+        existing = sorted(self.directory.glob(FILE_PATTERN))
+        self.file_index = int(existing[-1].stem.split("-")[-1]) + 1 if existing else 0
+        self.file = None
+        self._open_next_file()
+
+        self._stop_event = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="measurement-log", daemon=True)
+        self._flusher.start()
+
+    def _load_series(self):
+        path = self.directory / SERIES_FILE
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                for entry in json.load(f):
+                    key = (entry["instrument"], entry["channel"], entry["quantity"])
+                    self.series_ids[key] = entry["id"]
+
+    def _save_series(self):
+        entries = [
+            {"id": sid, "instrument": key[0], "channel": key[1], "quantity": key[2]}
+            for key, sid in self.series_ids.items()
+        ]
+        tmp = self.directory / (SERIES_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.directory / SERIES_FILE)
+
+    def _series_id(self, key):
+        sid = self.series_ids.get(key)
+        if sid is None:
+            sid = self.series_ids[key] = len(self.series_ids)
+            self._save_series()
+        return sid
+
+    def _open_next_file(self):
+        if self.file is not None:
+            self.file.close()
+        path = self.directory / f"measurements-{self.file_index:05d}.bin"
+        self.file_index += 1
+        self.file = open(path, "ab")
+
+    def record(self, instrument, channel, quantity, value, timestamp=None):
+        with self.lock:
+            sid = self._series_id((instrument, channel, quantity))
+            self.pending.append((time.time() if timestamp is None else timestamp, sid, float(value)))
+            if len(self.pending) >= self.chunk_records:
+                self._write_chunk()
+
+    def record_block(self, instrument, channel, quantity, timestamps, values):
+        chunk = np.empty(len(values), dtype=RECORD)
+        chunk["time"] = timestamps
+        chunk["value"] = values
+        with self.lock:
+            chunk["series"] = self._series_id((instrument, channel, quantity))
+            self._write_chunk()
+            self._write(chunk)
+
+    def _write_chunk(self):
+        if not self.pending:
+            return
+        chunk = np.array(self.pending, dtype=RECORD)
+        self.pending = []
+        self._write(np.sort(chunk, order="time"))
+
+    def _write(self, chunk):
+        self.file.write(chunk.tobytes())
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        if self.file.tell() >= self.max_file_bytes:
+            self._open_next_file()
+
+    def flush(self):
+        with self.lock:
+            self._write_chunk()
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Measurement log error: {e}")
+
+    def close(self):
+        self._stop_event.set()
+        with self.lock:
+            self._write_chunk()
+            self.file.close()
+
+
+class MeasurementLogReader:
+    # Memory-maps the log files so a long run can be sliced without loading it into RAM.
+    # Only files whose time span overlaps the requested range are touched.
+    def __init__(self, directory, margin=60.0):
+        self.directory = Path(directory)
+        self.margin = margin  # tolerance for samples logged slightly out of order
+        with open(self.directory / SERIES_FILE, encoding="utf-8") as f:
+            self.series = {
+                (e["instrument"], e["channel"], e["quantity"]): e["id"] for e in json.load(f)
+            }
+        self.maps = []
+        for path in sorted(self.directory.glob(FILE_PATTERN)):
+            # Ignore a trailing partial record left by a crash mid-write.
+            count = path.stat().st_size // RECORD.itemsize
+            if count:
+                self.maps.append(np.memmap(path, dtype=RECORD, mode="r", shape=(count,)))
+
+    def keys(self):
+        return list(self.series)
+
+    def read(self, instrument, channel, quantity, start=None, end=None):
+        sid = self.series.get((instrument, channel, quantity))
+        if sid is None:
+            return np.empty(0), np.empty(0)
+        start = -np.inf if start is None else start
+        end = np.inf if end is None else end
+        times, values = [], []
+        for records in self.maps:
+            if records["time"][-1] < start - self.margin or records["time"][0] > end + self.margin:
+                continue
+            t = records["time"]
+            mask = (records["series"] == sid) & (t >= start) & (t < end)
+            times.append(t[mask])
+            values.append(records["value"][mask])
+        if not times:
+            return np.empty(0), np.empty(0)
+        times, values = np.concatenate(times), np.concatenate(values)
+        order = np.argsort(times, kind="stable")
+        return times[order], values[order]
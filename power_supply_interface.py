@@ -26,4 +26,45 @@ class PowerSupplyInterface(ABC):
     def read_voltage(self, channel: int): pass
 
     @abstractmethod
-    def read_current(self, channel: int): pass
\ No newline at end of file
+    def read_current(self, channel: int): pass
+
+    @abstractmethod
+    def query_many(self, commands): pass
+
+    @abstractmethod
+    def read_all(self, channels=(1, 2)): pass
+
+
+class AsyncPowerSupplyInterface(ABC):
+    @abstractmethod
+    async def connect(self): pass
+
+    @abstractmethod
+    async def disconnect(self): pass
+
+    @abstractmethod
+    async def get_id(self): pass
+
+    @abstractmethod
+    async def set_voltage(self, channel: int, voltage: float): pass
+
+    @abstractmethod
+    async def set_current(self, channel: int, current: float): pass
+
+    @abstractmethod
+    async def output_on(self, channel: int): pass
+
+    @abstractmethod
+    async def output_off(self, channel: int): pass
+
+    @abstractmethod
+    async def read_voltage(self, channel: int): pass
+
+    @abstractmethod
+    async def read_current(self, channel: int): pass
+
+    @abstractmethod
+    async def query_many(self, commands): pass
+
+    @abstractmethod
+    async def read_all(self, channels=(1, 2)): pass
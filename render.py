@@ -0,0 +1,53 @@
+import collections
+import time
+
+
+class RenderScheduler:
+    # The one after() loop of the window. Every frame it calls each source (panels
+    # draining their pollers, log consoles, sweep progress), which display values
+    # through set_text/set_var: widgets are only reconfigured when what they show
+    # actually changes, so an unchanged reading costs a dict lookup, not a redraw.
+    def __init__(self, root, fps=10):
+        self.root = root
+        self.interval = 1.0 / fps
+        self.sources = []
+        self.shown = {}  # {widget or variable name: last options set through us}
+        self.frame_times = collections.deque(maxlen=1000)  # seconds spent per frame
+        self.updates = 0  # widget reconfigurations, for benchmarks
+        self.root.after(0, self.tick)
+
+    def add(self, source):
+        self.sources.append(source)
+
+    def remove(self, source):
+        if source in self.sources:
+            self.sources.remove(source)
+
+    def set_text(self, widget, text, **options):
+        # Widgets updated through here must not be configured directly elsewhere.
+        options["text"] = text
+        if self.shown.get(widget) == options:
+            return
+        widget.config(**options)
+        self.shown[widget] = options
+        self.updates += 1
+
+    def set_var(self, var, value):
+        key = str(var)
+        if self.shown.get(key) == value:
+            return
+        var.set(value)
+        self.shown[key] = value
+        self.updates += 1
+
+    def tick(self):
+        started = time.perf_counter()
+        for source in list(self.sources):
+            try:
+                source()
+            except Exception as e:
+                print(f"Render error in {getattr(source, '__qualname__', source)}: {e}")
+        elapsed = time.perf_counter() - started
+        self.frame_times.append(elapsed)
+        # Fixed frame rate: a slow frame shortens the wait, it never queues extra frames.
+        self.root.after(max(1, round((self.interval - elapsed) * 1000)), self.tick)
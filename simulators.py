@@ -0,0 +1,359 @@
+import argparse
+import math
+import random
+import socket
+import struct
+import threading
+import time
+
+# Stand-in TCP servers for the bench instruments. They implement the SCPI subset the
+# drivers in this repo send, with knobs for latency, jitter, split replies and dropped
+# connections. Run this file directly to start all three on the driver default ports.
+
+
+def normalize(header):
+    # "LOAD:STATe" and "LOAD:STAT" address the same node; compare on short forms.
+    return ":".join(node[:4] for node in header.upper().lstrip(":").split(":"))
+
+
+class SimulatedInstrument:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 split_packets=False, drop_rate=0.0, seed=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.split_packets = split_packets
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()  # instrument state is shared by all client connections
+        self.server = None
+        self.running = False
+        self.connections = set()
+
+    @property
+    def address(self):
+        return self.server.getsockname()[:2]
+
+    def start(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((self.host, self.port))
+        self.server.listen()
+        self.running = True
+        threading.Thread(target=self._accept_loop, name=f"sim-{type(self).__name__}", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        try:
+            self.server.close()
+        except OSError:
+            pass
+        for conn in list(self.connections):
+            self._close(conn)
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connections.add(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _close(self, conn):
+        self.connections.discard(conn)
+        try:
+            conn.shutdown(socket.SHUT_RDWR)  # unlike close(), also reaches a blocked recv
+        except OSError:
+            pass
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def _serve(self, conn):
+        buffer = b""
+        try:
+            while self.running:
+                data = conn.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    message = line.decode(errors="replace").strip()
+                    if not message:
+                        continue
+                    if self.drop_rate and self.random.random() < self.drop_rate:
+                        return  # simulate the instrument dropping the connection
+                    with self.lock:
+                        reply = self.handle(message)
+                    if reply is not None:
+                        self._send(conn, reply)
+        except OSError:
+            pass
+        finally:
+            self._close(conn)
+
+    def _send(self, conn, reply):
+        if isinstance(reply, str):
+            reply = (reply + "\n").encode()
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if not self.split_packets or len(reply) < 2:
+            conn.sendall(reply)
+            return
+        position = 0
+        while position < len(reply):
+            size = self.random.randint(1, max(1, len(reply) // 2))
+            conn.sendall(reply[position:position + size])
+            position += size
+            time.sleep(0.001)
+
+    def handle(self, message):
+        raise NotImplementedError
+
+
+class CPX400DPSimulator(SimulatedInstrument):
+    def __init__(self, port=9221, load_resistance=10.0, **kwargs):
+        super().__init__(port=port, **kwargs)
+        self.load_resistance = load_resistance
+        self.voltage = {1: 0.0, 2: 0.0}
+        self.current = {1: 0.0, 2: 0.0}
+        self.output = {1: False, 2: False}
+
+    def output_values(self, ch):
+        if not self.output[ch]:
+            return 0.0, 0.0
+        current = min(self.current[ch], self.voltage[ch] / self.load_resistance)
+        return current * self.load_resistance, current
+
+    def handle(self, message):
+        command, _, argument = message.partition(" ")
+        command = command.upper()
+        if command == "*IDN?":
+            return "THURLBY THANDAR, CPX400DP, 000000, 1.00-1.00-1.00"
+        try:
+            if command.startswith("OP") and command.endswith("?"):
+                return "1" if self.output[int(command[2:-1])] else "0"
+            if command.startswith("OP"):
+                self.output[int(command[2:])] = argument.strip() == "1"
+                return None
+            if command.endswith("O?"):
+                ch = int(command[1:-2])
+                voltage, current = self.output_values(ch)
+                return f"{voltage:.3f}V" if command[0] == "V" else f"{current:.3f}A"
+            if command.endswith("?"):
+                ch = int(command[1:-1])
+                values = self.voltage if command[0] == "V" else self.current
+                return f"{command[0]}{ch} {values[ch]:.3f}"
+            ch = int(command[1:])
+            (self.voltage if command[0] == "V" else self.current)[ch] = float(argument)
+        except (ValueError, KeyError, IndexError):
+            pass  # the real unit silently ignores malformed commands
+        return None
+
+
+class DMM6500Simulator(SimulatedInstrument):
+    def __init__(self, port=5025, sample_rate=10000.0, step_delay=0.0, **kwargs):
+        super().__init__(port=port, **kwargs)
+        self.sample_rate = sample_rate
+        self.step_delay = step_delay  # seconds from *TRG to the load step in digitize captures
+        self.binary = False
+        self.capacity = 100000
+        self.trigger_model = None
+        self.started = None
+        self.triggered = None
+        self.post_percent = 100
+        self.digitize = False
+        self.function = "VOLT:DC"
+        self.dig_function = "VOLT"
+        self.count = 1
+
+    def waveform(self, samples):
+        # 5 V with 50 Hz ripple; digitize captures get a load step at the trigger point.
+        values = [5.0 + 0.01 * math.sin(2 * math.pi * 50 * n / self.sample_rate) for n in samples]
+        if self.digitize and self.triggered is not None:
+            trigger_sample = self.capacity - round(self.capacity * self.post_percent / 100)
+            trigger_sample += round(self.step_delay * self.sample_rate)
+            for i, n in enumerate(samples):
+                if n >= trigger_sample:
+                    dt = (n - trigger_sample) / self.sample_rate
+                    values[i] -= 0.5 * (1 - math.exp(-dt / 2e-4)) - 0.2 * math.exp(-dt / 5e-5)
+        return values
+
+    def acquired(self):
+        if self.started is None:
+            return 0
+        if self.trigger_model == "LoopUntilEvent":
+            return self.capacity if self.triggered is not None else 0
+        if self.trigger_model == "Block":
+            return self.count
+        return int((time.monotonic() - self.started) * self.sample_rate)
+
+    def buffer_data(self, start, end):
+        total = self.acquired()
+        last = (total - 1) % self.capacity + 1 if total else 0
+        samples = [total - 1 - ((last - i) % self.capacity) for i in range(start, end + 1)]
+        if self.trigger_model in ("LoopUntilEvent", "Block"):
+            samples = [i - 1 for i in range(start, end + 1)]
+        values = self.waveform(samples)
+        rel = [max(n, 0) / self.sample_rate for n in samples]
+        if self.binary:
+            data = b"".join(struct.pack("<dd", v, r) for v, r in zip(values, rel))
+            size = str(len(data)).encode()
+            return b"#" + str(len(size)).encode() + size + data + b"\n"
+        return ",".join(f"{v:.6E},{r:.6f}" for v, r in zip(values, rel))
+
+    def handle(self, message):
+        upper = message.upper()
+        header = normalize(upper.split(" ")[0].split("?")[0])
+        if upper == "*IDN?":
+            return "KEITHLEY INSTRUMENTS,MODEL DMM6500,00000000,1.7.0"
+        is_query = "?" in upper.split(" ")[0]
+        if header == "SENS:FUNC" and is_query:
+            return '"NONE"' if self.digitize else f'"{self.function}"'
+        if header == "DIG:FUNC" and is_query:
+            return f'"{self.dig_function}"'
+        if is_query and header == "SENS:COUN":
+            return str(self.count)
+        if is_query and header == "TRAC:POIN":
+            return str(self.capacity)
+        if is_query and header == "TRAC:FILL:MODE":
+            return "CONT"
+        if is_query and header.startswith("DIG:") and header.endswith(":SRAT"):
+            return f"{self.sample_rate:g}"
+        if header.startswith("MEAS:VOLT") or header == "READ":
+            return f"{self.waveform([0])[0] + self.random.gauss(0, 1e-4):.6E}"
+        if header.startswith("MEAS:CURR"):
+            return f"{0.5 + self.random.gauss(0, 1e-5):.6E}"
+        if header in ("MEAS:RES", "MEAS:CONT"):
+            return f"{1.5 + self.random.gauss(0, 1e-3):.6E}"
+        if header == "FORM:DATA":
+            self.binary = "REAL" in upper
+        elif header.startswith("DIG:") and header.endswith(":SRAT"):
+            self.sample_rate = float(upper.split(" ")[1])
+        elif header == "SENS:COUN":
+            self.count = int(upper.split(" ")[1])
+        elif header == "TRAC:TRIG":
+            self.trigger_model = "Block"
+            self.started = time.monotonic()
+            self.triggered = None
+        elif upper == "*OPC?":
+            return "1"
+        elif header == "TRAC:POIN":
+            self.capacity = int(upper.split(" ")[1].split(",")[0])
+        elif header == "TRIG:LOAD":
+            self.trigger_model = message.split('"')[1]
+            if self.trigger_model == "LoopUntilEvent":
+                self.post_percent = int(upper.split(",")[2])
+        elif header == "DIG:FUNC":
+            self.digitize = True
+            self.dig_function = message.split('"')[1]
+        elif header == "SENS:FUNC":
+            self.digitize = False
+            self.function = message.split('"')[1]
+        elif header == "INIT":
+            self.started = time.monotonic()
+            self.triggered = None
+        elif upper == "*TRG":
+            self.triggered = time.monotonic()
+        elif header == "ABOR":
+            self.started = None
+        elif header == "TRIG:STAT":
+            if self.started is None or self.trigger_model != "LoopUntilEvent":
+                return "IDLE;IDLE;0"
+            if self.triggered is None:
+                return "RUNNING;RUNNING;0"
+            post_time = self.capacity * self.post_percent / 100 / self.sample_rate
+            done = time.monotonic() - self.triggered >= post_time
+            return "IDLE;IDLE;0" if done else "RUNNING;RUNNING;0"
+        elif header == "TRAC:ACT:END":
+            total = self.acquired()
+            return str((total - 1) % self.capacity + 1 if total else 0)
+        elif header == "TRAC:ACT":
+            return str(min(self.acquired(), self.capacity))
+        elif header == "TRAC:DATA":
+            arguments = message.split("?", 1)[1].split(",")
+            return self.buffer_data(int(arguments[0]), int(arguments[1]))
+        elif upper.endswith("?"):
+            return "0"
+        return None
+
+
+class ChromaLoadSimulator(SimulatedInstrument):
+    def __init__(self, port=5000, source_voltage=12.0, **kwargs):
+        super().__init__(port=port, **kwargs)
+        self.source_voltage = source_voltage
+        self.channel = 1
+        self.settings = {}  # {channel: {normalized header: value}}
+
+    def channel_settings(self):
+        return self.settings.setdefault(self.channel, {"LOAD:STAT": "0", "MODE": "CCL"})
+
+    def handle(self, message):
+        # Commands may be concatenated with ';' and a leading ':' resets to the root.
+        replies = [self.handle_one(part.strip()) for part in message.split(";") if part.strip()]
+        replies = [r for r in replies if r is not None]
+        return ";".join(replies) if replies else None
+
+    def handle_one(self, command):
+        name, _, argument = command.partition(" ")
+        header = normalize(name.rstrip("?"))
+        settings = self.channel_settings()
+        if name.endswith("?"):
+            if header == "*IDN":
+                return "CHROMA,63640-80-80,00000000,1.00"
+            if header == "*OPC":
+                return "1"
+            if header == "CHAN":
+                return str(self.channel)
+            if header == "MEAS:VOLT":
+                return f"{self.source_voltage if settings['LOAD:STAT'] == '1' else 0.0:.4f}"
+            if header.startswith("MEAS:CURR"):
+                level = float(settings.get("CURR:STAT:L1", 0)) if settings["LOAD:STAT"] == "1" else 0.0
+                return f"{level:.4f}"
+            return settings.get(header, "0")
+        if header == "CHAN":
+            self.channel = int(float(argument))
+        elif header == "LOAD:STAT":
+            settings[header] = "1" if argument.strip().upper() in ("ON", "1") else "0"
+        elif header == "CONF:REM":
+            pass
+        else:
+            settings[header] = argument.strip()
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run simulated bench instruments on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--psu-hosts", nargs="*", default=None,
+                        help="one CPX400DP per address, e.g. 127.0.0.2 127.0.0.3 (default: --host)")
+    parser.add_argument("--latency", type=float, default=0.0, help="reply delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay up to this many seconds")
+    parser.add_argument("--split", action="store_true", help="send replies in several small packets")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="probability of dropping a connection per command")
+    args = parser.parse_args()
+
+    options = dict(latency=args.latency, jitter=args.jitter, split_packets=args.split, drop_rate=args.drop_rate)
+    servers = [CPX400DPSimulator(host=host, **options) for host in (args.psu_hosts or [args.host])]
+    servers.append(DMM6500Simulator(host=args.host, **options))
+    servers.append(ChromaLoadSimulator(host=args.host, **options))
+    for server in servers:
+        server.start()
+        print(f"{type(server).__name__} listening on {server.address[0]}:{server.address[1]}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import socket
+
+
+class SocketReader:
+    # Buffers bytes from a socket so replies split over several packets, or several
+    # replies packed into one packet, are returned one terminator-delimited line at a time.
+    # Bytes after the terminator stay in the buffer for the next read.
+    #
+    # After a timeout the reply may still arrive later and would be taken as the answer
+    # to the next query, so the reader is marked desynchronized and refuses further
+    # reads: the owner has to open a new connection.
+    def __init__(self, sock: socket.socket, terminator: bytes = b"\n", chunk_size: int = 4096):
+        self.sock = sock
+        self.terminator = terminator
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.desynchronized = False
+
+    def _fill(self):
+        if self.desynchronized:
+            raise ConnectionError("Reply stream out of step after a timeout, reconnect first.")
+        try:
+            data = self.sock.recv(self.chunk_size)
+        except socket.timeout:
+            self.buffer.clear()
+            self.desynchronized = True
+            raise TimeoutError("Timed out waiting for instrument response.")
+        if not data:
+            raise ConnectionError("Connection closed by instrument.")
+        self.buffer.extend(data)
+
+    def read_line(self) -> str:
+        while True:
+            index = self.buffer.find(self.terminator)
+            if index >= 0:
+                line = bytes(self.buffer[:index])
+                del self.buffer[:index + len(self.terminator)]
+                return line.decode(errors="replace").strip()
+            self._fill()
+
+    def read_exact(self, size: int) -> bytes:
+        while len(self.buffer) < size:
+            self._fill()
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def clear(self):
+        self.buffer.clear()
@@ -0,0 +1,104 @@
+import threading
+import time
+from instrumentation import command_type
+
+
+class _Pending:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class StateCache:
+    # Per-instrument cache of query replies. TTLs are looked up per quantity using the
+    # command type ("V1?" and "V2?" both map to "Vn?"). Concurrent requests for the
+    # same key share a single instrument round trip.
+    def __init__(self, ttls=None, default_ttl=0.0):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self.entries = {}      # {key: (expires_at, value)}
+        self.pending = {}      # {key: _Pending} for fetches in flight
+        self.generations = {}  # bumped on invalidation so in-flight results are not stored
+        self.epoch = 0         # bumped by clear()
+
+    def ttl_for(self, key):
+        return self.ttls.get(command_type(key), self.default_ttl)
+
+    def _generation(self, key):
+        return self.epoch, self.generations.get(key, 0)
+
+    def _fresh(self, key, now):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry
+        return None
+
+    def get(self, key, fetch, store=True):
+        with self.lock:
+            entry = self._fresh(key, time.monotonic())
+            if entry is not None:
+                return entry[1]
+            pending = self.pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self.pending[key] = _Pending()
+                generation = self._generation(key)
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = fetch()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+            pending.event.set()
+        if store:
+            self.put(key, pending.value, generation)
+        return pending.value
+
+    def get_many(self, keys, fetch_many):
+        # Returns cached values when every key is fresh, otherwise fetches them all in one
+        # call (shared with any identical batch already in flight) and caches each reply.
+        with self.lock:
+            now = time.monotonic()
+            entries = [self._fresh(key, now) for key in keys]
+            if all(entry is not None for entry in entries):
+                return [entry[1] for entry in entries]
+            generations = [self._generation(key) for key in keys]
+
+        def fetch():
+            values = fetch_many(keys)
+            for key, value, generation in zip(keys, values, generations):
+                self.put(key, value, generation)
+            return values
+
+        # The joined key is only used to coalesce identical batches, never stored.
+        return self.get("\n".join(keys), fetch, store=False)
+
+    def put(self, key, value, generation=None):
+        ttl = self.ttl_for(key)
+        with self.lock:
+            if generation is not None and self._generation(key) != generation:
+                return  # invalidated while the value was being fetched
+            if ttl > 0:
+                self.entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+                self.generations[key] = self.generations.get(key, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.epoch += 1
+            self.entries.clear()
@@ -0,0 +1,60 @@
+import tkinter as tk
+from tkinter import ttk
+from instrumentation import STATS
+
+COLUMNS = [
+    ("instrument", "Instrument", 170),
+    ("command", "Command", 130),
+    ("count", "Count", 60),
+    ("p50", "p50 (ms)", 70),
+    ("p99", "p99 (ms)", 70),
+    ("max", "Max (ms)", 70),
+    ("errors", "Errors", 55),
+    ("timeouts", "Timeouts", 65),
+    ("bytes", "Bytes out/in", 100),
+]
+
+def fmt_ms(value):
+    return "--" if value is None else f"{value:.2f}"
+
+class StatsPanel:
+    # Small window with per-instrument, per-command latency and error counters.
+    def __init__(self, parent, refresh_ms=1000):
+        self.refresh_ms = refresh_ms
+        self.window = tk.Toplevel(parent)
+        self.window.title("Instrument Statistics")
+
+        self.tree = ttk.Treeview(self.window, columns=[c[0] for c in COLUMNS], show="headings", height=15)
+        for key, text, width in COLUMNS:
+            self.tree.heading(key, text=text)
+            self.tree.column(key, width=width, anchor="e" if key not in ("instrument", "command") else "w")
+        self.tree.grid(row=0, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+
+        self.reconnect_var = tk.StringVar(value="")
+        tk.Label(self.window, textvariable=self.reconnect_var, anchor="w").grid(row=1, column=0, sticky="ew", padx=5)
+        tk.Button(self.window, text="Reset", command=self.reset).grid(row=1, column=1, sticky="e", padx=5, pady=5)
+
+        self.window.rowconfigure(0, weight=1)
+        self.window.columnconfigure(0, weight=1)
+        self.refresh()
+
+    def reset(self):
+        STATS.reset()
+        self.refresh(reschedule=False)
+
+    def refresh(self, reschedule=True):
+        if not self.window.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        reconnects = []
+        for instrument, entry in STATS.snapshot().items():
+            if entry["reconnects"]:
+                reconnects.append(f"{instrument}: {entry['reconnects']}")
+            for command, s in entry["commands"].items():
+                self.tree.insert("", tk.END, values=(
+                    instrument, command, s["count"], fmt_ms(s["p50_ms"]), fmt_ms(s["p99_ms"]),
+                    fmt_ms(s["max_ms"]), s["errors"], s["timeouts"], f"{s['bytes_out']}/{s['bytes_in']}",
+                ))
+        self.reconnect_var.set("Reconnects: " + (", ".join(reconnects) if reconnects else "none"))
+        if reschedule:
+            self.window.after(self.refresh_ms, self.refresh)
@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+import numpy as np
+from cpx400dp import parse_reading
+from dmm_acquisition import configure_block, measure_block, restore_settings, save_settings
+
+SETTERS = {"voltage": "set_voltage", "current": "set_current"}
+
+
+def result_dtype(channels):
+    n = len(channels)
+    return np.dtype([
+        ("time", "<f8"),
+        ("setpoint", "<f8", (n,)),
+        ("psu_voltage", "<f8", (n,)),
+        ("psu_current", "<f8", (n,)),
+        ("dmm_mean", "<f8"),
+        ("dmm_std", "<f8"),
+        ("settle_time", "<f8"),
+        ("settled", "?"),
+    ])
+
+
+class SweepEngine:
+    # Steps one or more PSU channels through an array of set points. Each point waits
+    # until the output readback has reached the set point (within setpoint_tolerance plus
+    # setpoint_rel_tolerance of it) and stopped moving, then takes a block of DMM readings.
+    # A point that does not get there within settle_timeout (output off, current limit)
+    # is recorded with settled=False.
+    # run() blocks; start() runs the sweep on a worker thread and reports progress
+    # as (index, total, row) tuples on self.progress.
+    def __init__(self, psu, dmm=None, quantity="voltage", dmm_function="VOLT:DC", dmm_samples=5,
+                 dmm_nplc=0.1, tolerance=0.005, stable_reads=2, settle_timeout=2.0, poll_interval=0.005,
+                 setpoint_tolerance=0.02, setpoint_rel_tolerance=0.005):
+        if quantity not in SETTERS:
+            raise ValueError(f"Cannot sweep '{quantity}'.")
+        self.psu = psu
+        self.dmm = dmm
+        self.quantity = quantity
+        self.dmm_function = dmm_function
+        self.dmm_samples = dmm_samples
+        self.dmm_nplc = dmm_nplc
+        self.tolerance = tolerance
+        self.setpoint_tolerance = setpoint_tolerance
+        self.setpoint_rel_tolerance = setpoint_rel_tolerance
+        self.stable_reads = stable_reads
+        self.settle_timeout = settle_timeout
+        self.poll_interval = poll_interval
+        self.progress = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = None
+        self.result = None
+        self.error = None
+
+    def start(self, channels, setpoints):
+        self.cancelled.clear()
+        self.result = self.error = None
+        self.thread = threading.Thread(target=self._run_thread, args=(channels, setpoints),
+                                       name="sweep", daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run_thread(self, channels, setpoints):
+        try:
+            self.result = self.run(channels, setpoints)
+        except Exception as e:
+            self.error = e
+        self.progress.put(None)  # end of sweep
+
+    def run(self, channels, setpoints):
+        channels = tuple(channels)
+        points = np.asarray(setpoints, dtype=float)
+        if points.ndim == 1:
+            points = points[:, None]
+        if points.ndim != 2 or points.shape[1] != len(channels):
+            raise ValueError(f"Set points must have one column per channel ({len(channels)}).")
+
+        result = np.zeros(len(points), dtype=result_dtype(channels))
+        result["dmm_mean"] = result["dmm_std"] = np.nan
+        set_fn = getattr(self.psu, SETTERS[self.quantity])
+        readback = [f"{q}{ch}O?" for ch in channels for q in ("V", "I")]
+        if self.dmm is None:
+            return self._sweep(channels, points, result, set_fn, readback)
+        # Everything configure_block changes is put back, so MEAS? queries and the front
+        # panel see the DMM as it was before the sweep.
+        saved = save_settings(self.dmm, [f"{self.dmm_function}:NPLC", "SENS:COUN", "TRAC:POIN", "FUNC"])
+        configure_block(self.dmm, self.dmm_function, self.dmm_samples, self.dmm_nplc)
+        try:
+            return self._sweep(channels, points, result, set_fn, readback)
+        finally:
+            restore_settings(self.dmm, saved)
+
+    def _sweep(self, channels, points, result, set_fn, readback):
+        for index, point in enumerate(points):
+            if self.cancelled.is_set():
+                return result[:index]
+            for ch, value in zip(channels, point):
+                set_fn(ch, value)
+            self.psu.flush()
+
+            row = result[index]
+            row["time"] = time.time()
+            row["setpoint"] = point
+            settled, settle_time, values = self.settle(readback, point)
+            row["settled"] = settled
+            row["settle_time"] = settle_time
+            row["psu_voltage"] = values[0::2]
+            row["psu_current"] = values[1::2]
+            if self.dmm is not None:
+                _, readings = measure_block(self.dmm, self.dmm_samples)
+                row["dmm_mean"] = readings.mean()
+                row["dmm_std"] = readings.std()
+            self.progress.put((index + 1, len(points), row.copy()))
+        return result
+
+    def settle(self, commands, targets):
+        # Polls the (V, I) readback pairs until the swept quantity is within the set point
+        # band and stable_reads consecutive reads agree with the previous one within
+        # tolerance. Returns (settled, seconds, last readings).
+        column = 0 if self.quantity == "voltage" else 1
+        band = self.setpoint_tolerance + self.setpoint_rel_tolerance * np.abs(targets)
+        started = time.perf_counter()
+        previous = None
+        stable = 0
+        while True:
+            values = np.array([parse_reading(r) for r in self.psu.query_many(commands)])
+            elapsed = time.perf_counter() - started
+            on_target = np.all(np.abs(values[column::2] - targets) <= band)
+            if on_target and previous is not None and np.all(np.abs(values - previous) <= self.tolerance):
+                stable += 1
+                if stable >= self.stable_reads:
+                    return True, elapsed, values
+            else:
+                stable = 0
+            if elapsed > self.settle_timeout:
+                return False, elapsed, values
+            previous = values
+            time.sleep(self.poll_interval)
+
+
+def save_result(result, path):
+    # Structured arrays keep their field names in .npy files (np.load(path) gives them back).
+    np.save(path, result)
@@ -0,0 +1,88 @@
+import importlib
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulators import CPX400DPSimulator, ChromaLoadSimulator, DMM6500Simulator
+
+
+@pytest.fixture
+def psu_sim():
+    server = CPX400DPSimulator(port=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def dmm_sim():
+    server = DMM6500Simulator(port=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def load_sim():
+    server = ChromaLoadSimulator(port=0).start()
+    yield server
+    server.stop()
+
+
+class FakeSdfRead:
+    # Stands in for stk500.SDF_read: parses "name address type" lines and counts the
+    # parses, so tests can tell a cache hit from a real parse.
+    parses = 0
+
+    def __init__(self, communication=None, sdf_path=None):
+        self.communication = communication
+        self.sdf_path = sdf_path
+        self.prepare_sdf()
+        FakeSdfRead.parses += 1
+        self.variables = {}
+        with open(self.sdf_path, encoding="utf-8") as f:
+            for line in f:
+                name, address, kind = line.split()
+                self.variables[name] = (int(address, 0), kind)
+
+    def prepare_sdf(self):
+        pass
+
+
+class FakeStk500Interface:
+    # Stands in for stk500.STK500_interface, holding the SDF variables in a dict.
+    def __init__(self, SDF_class=None, com=None):
+        self.com = com
+        self.values = {}
+
+    def initialize_connection(self):
+        pass
+
+    def write_value(self, names, values):
+        self.values.update(zip(names, values))
+
+    def read_value(self, names):
+        return [self.values.get(name, 0) for name in names]
+
+
+@pytest.fixture
+def serial_connection(monkeypatch):
+    # SerialConnection imported against a fake stk500 package; the real one is a
+    # vendor install that is not available everywhere.
+    package = types.ModuleType("stk500")
+    package.__path__ = []
+    sdf_read = types.ModuleType("stk500.SDF_read")
+    sdf_read.SDF_read = FakeSdfRead
+    sdf_read.__file__ = __file__  # parser_fingerprint hashes the parser source
+    FakeSdfRead.__module__ = sdf_read.__name__
+    interface = types.ModuleType("stk500.STK500_interface")
+    interface.STK500_interface = FakeStk500Interface
+    for module in (package, sdf_read, interface):
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+    monkeypatch.delitem(sys.modules, "SerialConnection", raising=False)
+    module = importlib.import_module("SerialConnection")
+    monkeypatch.setitem(sys.modules, "SerialConnection", module)
+    FakeSdfRead.parses = 0
+    return module
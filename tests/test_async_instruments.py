@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from async_instruments import AsyncCPX400DP, AsyncChromaLoad, AsyncDMM6500, poll_all
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_cpx_set_points_read_back(psu_sim):
+    async def scenario():
+        psu = AsyncCPX400DP(*psu_sim.address)
+        await psu.set_voltage(1, 5.0)
+        await psu.set_current(1, 1.0)
+        await psu.output_on(1)
+        values = await psu.read_all()
+        await psu.disconnect()
+        return values
+
+    values = run(scenario())
+    assert values[1] == pytest.approx((5.0, 1.0))
+    assert values[2] == (0.0, 0.0)
+
+
+def test_dmm_and_load_queries(dmm_sim, load_sim):
+    async def scenario():
+        dmm = AsyncDMM6500(*dmm_sim.address)
+        load = AsyncChromaLoad(*load_sim.address)
+        await load.apply_commands(["CHAN 1", "CURR:STAT:L1 2.5"])
+        await load.load_on()
+        results = (await dmm.read_voltage(), await load.check_load_status(), await load.measure_current())
+        await dmm.disconnect()
+        await load.disconnect()
+        return results
+
+    voltage, load_on, current = run(scenario())
+    assert isinstance(voltage, float)
+    assert load_on
+    assert float(current) == pytest.approx(2.5)
+
+
+def test_poll_all_returns_failures_without_cancelling_the_rest(psu_sim, load_sim):
+    async def scenario():
+        psu = AsyncCPX400DP(*psu_sim.address)
+        load = AsyncChromaLoad(*load_sim.address)
+        # Nothing listens on port 1, so only this poll fails.
+        missing = AsyncDMM6500("127.0.0.1", 1, timeout=0.5)
+        results = await poll_all({"psu": psu.read_all, "load": load.check_load_status, "dmm": missing.read_voltage})
+        await psu.disconnect()
+        await load.disconnect()
+        return results
+
+    results = run(scenario())
+    assert results["psu"][1] == (0.0, 0.0)
+    assert results["load"] is False
+    assert isinstance(results["dmm"], OSError)
+
+
+def test_timeout_drops_the_connection(psu_sim):
+    async def scenario():
+        psu = AsyncCPX400DP(*psu_sim.address, timeout=0.2)
+        # A write never gets a reply, so asking for one must time out...
+        with pytest.raises(asyncio.TimeoutError):
+            await psu._exchange(["OP1 1"], 1)
+        assert psu.writer is None
+        # ...and the next call starts on a fresh stream.
+        reply = await psu.get_id()
+        await psu.disconnect()
+        return reply
+
+    assert "CPX400DP" in run(scenario())
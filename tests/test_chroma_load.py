@@ -0,0 +1,104 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from chroma_load import ChromaLoad
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_commands_round_trip(load_sim):
+    load = ChromaLoad(*load_sim.address)
+    load.select_channel(3)
+    load.set_static_current(1.5)
+    load.load_on()
+    assert load.check_load_status()
+    assert float(load.measure_current()) == 1.5
+    load.load_off()
+    assert not load.check_load_status()
+    load.disconnect()
+
+
+def test_unreachable_load_gives_up_after_retries():
+    load = ChromaLoad("127.0.0.1", free_port(), timeout=0.2, max_retries=2, backoff=0.01)
+    with pytest.raises(OSError):
+        load.send_command("LOAD:STATe?")
+    assert load.stats["errors"] == 3
+
+
+@pytest.mark.parametrize("action", [
+    lambda load: load.send_command("*IDN?"),
+    lambda load: load.set_point("MODE CCH"),
+    lambda load: load.apply_commands(["MODE CCH", "LOAD:STATe ON"]),
+    lambda load: load.resync(),
+])
+def test_backoff_does_not_hold_the_lock(action):
+    load = ChromaLoad("127.0.0.1", free_port(), timeout=0.2, max_retries=3, backoff=0.3)
+    threading.Thread(target=lambda: pytest.raises(OSError, action, load), daemon=True).start()
+    time.sleep(0.1)
+    started = time.monotonic()
+    assert load.lock.acquire(timeout=1.0)
+    load.lock.release()
+    assert time.monotonic() - started < 0.2
+
+
+def test_command_is_not_resent_after_a_lost_reply(load_sim):
+    load = ChromaLoad(*load_sim.address, timeout=0.2, backoff=0.01)
+    load.ensure_connected()
+    received = []
+    handle = load_sim.handle
+    load_sim.handle = lambda message: received.append(message) or handle(message)
+    load_sim.latency = 0.4
+    with pytest.raises(TimeoutError):
+        load.send_command("LOAD:STATe ON;:*OPC?")
+    load_sim.latency = 0.0
+    time.sleep(0.5)
+    assert received == ["LOAD:STATe ON;:*OPC?"]
+    load.disconnect()
+
+
+def test_reconnects_after_the_load_drops_the_connection(load_sim):
+    load = ChromaLoad(*load_sim.address, backoff=0.01)
+    assert load.send_command("CHAN?") == "1"
+    for conn in list(load_sim.connections):
+        conn.shutdown(socket.SHUT_RDWR)
+    time.sleep(0.05)
+    assert load.send_command("CHAN?") == "1"
+    assert load.stats["reconnects"] == 1
+    load.disconnect()
+
+
+def test_shadow_is_read_back_on_connect(load_sim):
+    load = ChromaLoad(*load_sim.address)
+    load.ensure_connected()
+    assert load.setpoints == {"CHAN": "1", ("1", "MODE"): "CCL", ("1", "LOAD:STATE"): "0"}
+    received = []
+    handle = load_sim.handle
+    load_sim.handle = lambda message: received.append(message) or handle(message)
+    load.set_point("MODE CCH")
+    load.send_command("*OPC?")
+    assert received == ["MODE CCH", "*OPC?"]
+    load.disconnect()
+
+
+def test_unconfirmed_batch_forgets_its_set_points(load_sim):
+    load = ChromaLoad(*load_sim.address)
+    load.apply_commands(["MODE CCH"])
+    handle = load_sim.handle
+    load_sim.handle = lambda message: "0" if message.endswith("*OPC?") else handle(message)
+    with pytest.raises(RuntimeError):
+        load.apply_commands(["MODE CRL"])
+    assert ("1", "MODE") not in load.setpoints
+    load_sim.handle = handle
+    # Not skipped although the load may well be in CCH again.
+    received = []
+    load_sim.handle = lambda message: received.append(message) or handle(message)
+    load.apply_commands(["MODE CCH"])
+    assert received == ["MODE CCH;:*OPC?"]
+    load.disconnect()
@@ -0,0 +1,31 @@
+from discovery import discover, identify, merge_config
+
+
+def test_discover_identifies_the_simulators(psu_sim, dmm_sim, load_sim):
+    ports = [sim.address[1] for sim in (psu_sim, dmm_sim, load_sim)]
+    devices = discover("127.0.0.1/32", ports=ports, timeout=0.5)
+    assert sorted(device["kind"] for device in devices) == ["dmms", "loads", "psus"]
+
+
+def test_identify():
+    assert identify("THURLBY THANDAR, CPX400DP, 000000, 1.00") == "psus"
+    assert identify("SOME VENDOR,SCOPE,1,1") is None
+
+
+def test_merge_keeps_the_existing_config():
+    config = {
+        "psus": [{"name": "PSU Left", "ip": "192.168.0.105"}],
+        "stk500": {"com_port": "COM9"},
+        "poll_workers": 4,
+        "polling": {"io_budget": 40},
+    }
+    devices = [
+        {"ip": "192.168.0.105", "port": 9221, "idn": "THURLBY THANDAR, CPX400DP, 1, 1", "kind": "psus"},
+        {"ip": "192.168.0.104", "port": 5025, "idn": "KEITHLEY INSTRUMENTS,MODEL DMM6500,1,1", "kind": "dmms"},
+    ]
+    merged = merge_config(devices, config)
+    assert merged["psus"] == config["psus"]
+    assert merged["dmms"] == [{"name": "DMM6500 192.168.0.104", "ip": "192.168.0.104", "port": 5025}]
+    assert merged["loads"] == []
+    for key in ("stk500", "poll_workers", "polling"):
+        assert merged[key] == config[key]
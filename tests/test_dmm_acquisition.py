@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from dmm_acquisition import DMMStream, configure_block, measure_block
+from headless_runner import Station
+from instrument_registry import InstrumentRegistry
+from keithleyDMM6500 import DMM6500
+
+
+@pytest.fixture
+def received(dmm_sim):
+    messages = []
+    handle = dmm_sim.handle
+    dmm_sim.handle = lambda message: messages.append(message) or handle(message)
+    return messages
+
+
+def test_measure_block(dmm_sim):
+    dmm = DMM6500(*dmm_sim.address)
+    configure_block(dmm, count=20, nplc=0.1)
+    rel, values = measure_block(dmm, 20)
+    assert len(values) == 20
+    assert np.allclose(values, 5.0, atol=0.02)
+    assert dmm.query("*IDN?").startswith("KEITHLEY")  # replies are ASCII again
+    dmm.close()
+
+
+def test_stream_keeps_the_front_panel_settings(dmm_sim, received):
+    dmm = DMM6500(*dmm_sim.address)
+    stream = DMMStream(dmm, capacity=1000)
+    stream.start()
+    _, values = stream.read_block(2500)  # wraps the 1000 sample buffer
+    stream.stop()
+    dmm.query("*OPC?")  # every write above has been handled once this answers
+    dmm.close()
+    assert len(values) == 2500
+    assert "*RST" not in received
+    # The trigger model is cleared and everything the stream changed is put back, the function last.
+    restored = received[received.index("ABOR") + 1:-1]
+    assert [m.split(" ")[0] for m in restored] == [
+        "TRIG:LOAD", "VOLT:DC:RANG:AUTO", "VOLT:DC:AZER", "VOLT:DC:NPLC", "DISP:LIGH:STAT",
+        "TRAC:POIN", "TRAC:FILL:MODE", "SENS:FUNC"]
+
+
+def test_headless_stream_step(dmm_sim):
+    ip, port = dmm_sim.address
+    station = Station("test", InstrumentRegistry({"dmms": [{"name": "DMM", "ip": ip, "port": port}]}), [])
+    station.open()
+    entry = station.execute({"step": "stream", "instrument": "DMM", "samples": 500,
+                             "statistic": "pp", "name": "ripple", "max": 0.05})
+    station.close()
+    assert entry["passed"], entry
+    assert 0 < entry["value"] <= 0.02
@@ -0,0 +1,100 @@
+import json
+import time
+
+import pytest
+
+from headless_runner import ResultWriter, Station, load_stations, run_station
+from instrument_registry import InstrumentRegistry
+from load_profiles import LoadProfile
+
+STEPS = [
+    {"step": "psu", "psu": "PSU", "channel": 1, "voltage": 5, "current": 1, "output": True},
+    {"step": "profile", "load": "Chroma", "profile": "Pump"},
+    {"step": "measure", "instrument": "PSU", "channel": 1, "quantity": "voltage", "name": "vout", "min": 4.9, "max": 5.1},
+    {"step": "measure", "instrument": "Chroma", "quantity": "current", "name": "iload", "min": 0.9},
+]
+CLEANUP = [
+    {"step": "load_off", "load": "Chroma"},
+    {"step": "psu", "psu": "PSU", "channel": 1, "output": False},
+]
+
+
+def bench(psu_sim, dmm_sim, load_sim):
+    def spec(name, sim):
+        return [{"name": name, "ip": sim.address[0], "port": sim.address[1]}]
+    return {"psus": spec("PSU", psu_sim), "dmms": spec("DMM", dmm_sim), "loads": spec("Chroma", load_sim)}
+
+
+@pytest.fixture
+def station(psu_sim, dmm_sim, load_sim):
+    profiles = [LoadProfile("Pump", 1, "CCH", {"L1": 1, "L2": 1})]
+    return Station("A", InstrumentRegistry(bench(psu_sim, dmm_sim, load_sim)), profiles, duts=["SN1", "SN2"])
+
+
+def eventually(condition, timeout=1.0):
+    # The cleanup writes expect no reply; give the simulator time to handle them.
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_every_dut_gets_a_result_line(station, psu_sim, load_sim, tmp_path):
+    path = tmp_path / "results.jsonl"
+    summary = run_station(station, STEPS, CLEANUP, ResultWriter(path))
+    assert summary == {"station": "A", "passed": 2, "failed": 0}
+    results = read_results(path)
+    assert [r["dut"] for r in results] == ["SN1", "SN2"]
+    steps = results[0]["steps"]
+    assert [s["step"] for s in steps] == ["psu", "profile", "measure", "measure", "load_off", "psu"]
+    assert steps[2] == {"step": "measure", "passed": True, "name": "vout", "value": pytest.approx(5.0)}
+    assert steps[3]["value"] == pytest.approx(1.0)
+    assert all(s.get("cleanup") for s in steps[4:])
+    # The cleanup ran after the last DUT too.
+    assert eventually(lambda: not psu_sim.output[1])
+    assert eventually(lambda: load_sim.settings[1]["LOAD:STAT"] == "0")
+
+
+def test_failed_step_skips_the_rest_but_not_the_cleanup(station, load_sim, tmp_path):
+    path = tmp_path / "results.jsonl"
+    steps = [STEPS[0], {"step": "profile", "load": "Chroma", "profile": "Heater"}] + STEPS[2:]
+    summary = run_station(station, steps, CLEANUP, ResultWriter(path))
+    assert summary["failed"] == 2
+    result = read_results(path)[0]
+    assert not result["passed"]
+    assert [s["step"] for s in result["steps"]] == ["psu", "profile", "load_off", "psu"]
+    assert result["steps"][1]["error"] == "StepError: Unknown load profile 'Heater'."
+
+
+def test_out_of_limits_fails_the_dut(station, tmp_path):
+    path = tmp_path / "results.jsonl"
+    steps = STEPS[:2] + [dict(STEPS[2], min=5.5)]
+    run_station(station, steps, CLEANUP, ResultWriter(path))
+    measure = read_results(path)[0]["steps"][2]
+    assert measure["passed"] is False
+    assert measure["value"] == pytest.approx(5.0)
+
+
+def test_unreachable_station_reports_an_error(tmp_path):
+    registry = InstrumentRegistry({"dmms": [{"name": "DMM", "ip": "127.0.0.1", "port": 1}]})
+    path = tmp_path / "results.jsonl"
+    summary = run_station(Station("B", registry, [], duts=["SN1"]), STEPS, CLEANUP, ResultWriter(path))
+    assert summary["passed"] == summary["failed"] == 0
+    assert "DMM" in summary["error"]
+    assert not path.exists()
+
+
+def test_stations_file(psu_sim, dmm_sim, load_sim, tmp_path):
+    path = tmp_path / "stations.json"
+    path.write_text(json.dumps({"stations": [
+        {"name": "A", "bench": bench(psu_sim, dmm_sim, load_sim), "duts": ["SN7"]},
+        {"name": "B", "bench": bench(psu_sim, dmm_sim, load_sim)},
+    ]}))
+    stations = load_stations(path, 2)
+    assert [s.duts for s in stations] == [["SN7"], ["B-0001", "B-0002"]]
+    assert "Pump" in stations[0].profiles  # the shipped profiles
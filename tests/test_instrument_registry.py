@@ -0,0 +1,55 @@
+import socket
+
+import pytest
+
+from instrument_registry import InstrumentRegistry
+from simulators import ChromaLoadSimulator, DMM6500Simulator
+
+
+def test_poll_rates_lookup_order():
+    registry = InstrumentRegistry({"polling": {"rates": {
+        "PSU Left/readings": {"active": 0.1, "idle": 0.2},
+        "PSU Left": {"active": 0.3, "idle": 0.4},
+        "state": {"active": 0.5},
+        "default": {"active": 0.6, "idle": 0.7},
+    }}})
+    assert registry.poll_rates("PSU Left", "readings") == (0.1, 0.2)
+    assert registry.poll_rates("PSU Left", "state") == (0.3, 0.4)
+    assert registry.poll_rates("Chroma", "state") == (0.5, 0.5)  # idle defaults to active
+    assert registry.poll_rates("DMM", "measurement") == (0.6, 0.7)
+
+
+def test_poll_rates_without_a_polling_section():
+    registry = InstrumentRegistry({})
+    assert registry.poll_rates("Chroma", "state") == (1.0, 5.0)
+    assert registry.scheduler_options() == {"max_workers": 4, "io_budget": None,
+                                            "max_backoff": 30.0, "breaker_threshold": 3}
+
+
+def test_config_errors():
+    with pytest.raises(ValueError):
+        InstrumentRegistry({"psus": [{"name": "PSU"}]})
+    with pytest.raises(ValueError):
+        InstrumentRegistry({"psus": [{"name": "A", "ip": "1.2.3.4"}], "dmms": [{"name": "A", "ip": "1.2.3.5"}]})
+
+
+def test_connect_all_reports_unreachable_instruments():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        closed_port = s.getsockname()[1]
+    dmm_sim = DMM6500Simulator(port=0).start()
+    load_sim = ChromaLoadSimulator(port=0).start()
+    try:
+        registry = InstrumentRegistry({
+            "dmms": [{"name": "DMM", "ip": dmm_sim.address[0], "port": dmm_sim.address[1]}],
+            "loads": [{"name": "Chroma", "ip": load_sim.address[0], "port": load_sim.address[1]},
+                      {"name": "Gone", "ip": "127.0.0.1", "port": closed_port, "max_retries": 0}],
+        })
+        errors = registry.connect_all()
+        assert list(errors) == ["Gone"]
+        assert registry.dmms["DMM"].query("*IDN?").startswith("KEITHLEY")
+        registry.dmms["DMM"].close()
+        registry.loads["Chroma"].disconnect()
+    finally:
+        dmm_sim.stop()
+        load_sim.stop()
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from chroma_load import ChromaLoad
+from load_profiles import LoadProfile, get_profiles_path, load_profiles
+
+
+def test_compile_orders_the_commands():
+    profile = LoadProfile("Heater", 3, "CCH", {"L1": 10, "l2": 10}, slew={"fall": 1.5, "rise": 1.5})
+    assert profile.compile() == [
+        "CONF:REM ON", "CHAN 3", "MODE CCH",
+        "CURR:STAT:L1 10", "CURR:STAT:L2 10",
+        "CURR:STAT:RISE 1.5", "CURR:STAT:FALL 1.5",
+        "LOAD:STATe ON",
+    ]
+
+
+def test_compile_uses_the_mode_family_root():
+    profile = LoadProfile("Dynamic", 1, "CCDL", {"L1": 1, "T1": 0.01}, load=False, remote=False)
+    assert profile.compile() == ["CHAN 1", "MODE CCDL", "CURR:DYN:L1 1", "CURR:DYN:T1 0.01", "LOAD:STATe OFF"]
+    assert LoadProfile("Voltage", 1, "CV", {"L1": 5}).compile()[3] == "VOLT:STAT:L1 5"
+
+
+@pytest.mark.parametrize("arguments, message", [
+    (dict(mode="CC", levels={"L1": 1}), "Unknown mode"),
+    (dict(mode="CCH", levels={"L3": 1}), "Unknown level"),
+    (dict(mode="CCH", levels={"T1": 1}), "Unknown level"),  # dwell times are dynamic only
+    (dict(mode="CCH", levels={"L1": 1}, slew={"up": 1}), "Unknown slew edge"),
+    (dict(mode="CV", levels={"L1": 5}, slew={"rise": 1}), "not supported in CV"),
+])
+def test_invalid_profiles_are_rejected(arguments, message):
+    with pytest.raises(ValueError, match=message):
+        LoadProfile("Bad", 1, **arguments)
+
+
+def test_folder_is_read_in_name_order(tmp_path):
+    (tmp_path / "b.json").write_text(json.dumps({"channel": 1, "mode": "CRL", "levels": {"L1": 100}}))
+    (tmp_path / "a.json").write_text(json.dumps({"name": "First", "channel": 2, "mode": "CCL", "levels": {"L1": 1}}))
+    profiles = load_profiles(tmp_path)
+    assert [p.name for p in profiles] == ["First", "b"]
+    assert profiles[1].describe() == "CH1 CRL, L1 100, load ON"
+
+
+def test_shipped_profiles_are_valid():
+    assert load_profiles(get_profiles_path())
+
+
+def test_apply_sends_one_confirmed_batch(load_sim):
+    load = ChromaLoad(*load_sim.address)
+    load.ensure_connected()
+    received = []
+    handle = load_sim.handle
+    load_sim.handle = lambda message: received.append(message) or handle(message)
+    LoadProfile("Pump", 3, "CCH", {"L1": 1, "L2": 1}).apply(load)
+    load.disconnect()
+    assert len(received) == 1 and received[0].endswith(";:*OPC?")
+    assert load_sim.settings[3]["CURR:STAT:L1"] == "1"
+    assert load_sim.settings[3]["LOAD:STAT"] == "1"
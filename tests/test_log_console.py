@@ -0,0 +1,95 @@
+import threading
+import tkinter as tk
+
+import pytest
+
+import log_console
+from log_console import LogConsole
+
+
+class FakeText:
+    # Enough of tk.Text for LogConsole, without a display: inserts are ignored while
+    # the widget is disabled, as Tk does.
+    def __init__(self, parent, state="normal", **options):
+        self.state = state
+        self.content = ""
+        self.inserts = 0
+
+    def configure(self, state):
+        self.state = state
+
+    def insert(self, index, text):
+        assert index == tk.END
+        if self.state == "normal":
+            self.content += text
+            self.inserts += 1
+
+    def delete(self, first, last):
+        assert first == "1.0"
+        self.content = "\n".join(self.content.split("\n")[int(last.split(".")[0]) - 1:])
+
+    def see(self, index):
+        pass
+
+    def lines(self):
+        return self.content.splitlines()
+
+
+@pytest.fixture(autouse=True)
+def fake_text(monkeypatch):
+    monkeypatch.setattr(log_console.tk, "Text", FakeText)
+
+
+def test_writes_wait_for_one_batched_flush():
+    console = LogConsole(None)
+    for n in range(3):
+        console.write(f"line {n}")
+    assert console.text.content == ""
+    console.flush()
+    assert console.text.lines() == ["line 0", "line 1", "line 2"]
+    assert console.text.inserts == 1
+    assert console.text.state == "disabled"
+    console.flush()  # nothing pending: the widget is left alone
+    assert console.text.inserts == 1
+
+
+def test_keeps_the_newest_max_lines():
+    console = LogConsole(None, max_lines=5)
+    for n in range(4):
+        console.write(f"line {n}")
+    console.flush()
+    for n in range(4, 20):
+        console.write(f"line {n}")
+    console.flush()
+    assert console.text.lines() == [f"line {n}" for n in range(15, 20)]
+    assert console.lines == 5
+
+
+def test_multi_line_messages_count_every_line():
+    console = LogConsole(None, max_lines=4)
+    console.write("a\nb\nc")
+    console.flush()
+    console.write("d\ne")
+    console.flush()
+    assert console.text.lines() == ["b", "c", "d", "e"]
+
+
+def test_any_thread_may_write():
+    console = LogConsole(None, max_lines=1000)
+    threads = [threading.Thread(target=lambda t=t: [console.write(f"{t}-{n}") for n in range(100)])
+               for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    console.flush()
+    assert sorted(console.text.lines()) == sorted(f"{t}-{n}" for t in range(4) for n in range(100))
+
+
+def test_lines_are_mirrored_to_the_log_file(tmp_path):
+    path = tmp_path / "load.log"
+    console = LogConsole(None, log_file=str(path))
+    console.write("load on")
+    for handler in console.logger.handlers:
+        handler.flush()
+    assert path.read_text(encoding="utf-8").rstrip().endswith("load on")
@@ -0,0 +1,46 @@
+import numpy as np
+
+from measurement_log import RECORD, MeasurementLogger, MeasurementLogReader
+
+
+def test_round_trip(tmp_path):
+    logger = MeasurementLogger(tmp_path, flush_interval=60)
+    for n in range(5):
+        logger.record("PSU Left", 1, "voltage", 12 + n, timestamp=n)
+    logger.record("DMM", None, "voltage", 5.0, timestamp=2.5)
+    logger.record_block("DMM", None, "current", np.arange(10, 13), [0.1, 0.2, 0.3])
+    logger.close()
+
+    reader = MeasurementLogReader(tmp_path)
+    assert set(reader.keys()) == {("PSU Left", 1, "voltage"), ("DMM", None, "voltage"), ("DMM", None, "current")}
+    times, values = reader.read("PSU Left", 1, "voltage")
+    assert times.tolist() == [0, 1, 2, 3, 4]
+    assert values.tolist() == [12, 13, 14, 15, 16]
+    assert reader.read("PSU Left", 1, "voltage", start=1, end=3)[0].tolist() == [1, 2]
+    assert reader.read("DMM", None, "current")[1].tolist() == [0.1, 0.2, 0.3]
+    assert reader.read("PSU Right", 1, "voltage")[0].size == 0
+
+
+def test_rotation_and_reopening(tmp_path):
+    logger = MeasurementLogger(tmp_path, chunk_records=4, flush_interval=60, max_file_bytes=4 * RECORD.itemsize)
+    for n in range(12):
+        logger.record("Chroma", None, "current", n, timestamp=n)
+    logger.close()
+    assert len(list(tmp_path.glob("measurements-*.bin"))) >= 3
+
+    # A new logger keeps the series ids and appends to new files.
+    logger = MeasurementLogger(tmp_path, flush_interval=60)
+    logger.record("Chroma", None, "current", 12, timestamp=12)
+    logger.close()
+    times, values = MeasurementLogReader(tmp_path).read("Chroma", None, "current")
+    assert times.tolist() == list(range(13))
+
+
+def test_partial_record_is_ignored(tmp_path):
+    logger = MeasurementLogger(tmp_path, flush_interval=60)
+    logger.record("PSU Left", 1, "current", 1.0, timestamp=1)
+    logger.close()
+    path = sorted(tmp_path.glob("measurements-*.bin"))[0]
+    with open(path, "ab") as f:
+        f.write(b"\x00" * (RECORD.itemsize // 2))  # crash mid-write
+    assert MeasurementLogReader(tmp_path).read("PSU Left", 1, "current")[1].tolist() == [1.0]
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from acquisition import PollScheduler
+from chroma_load import ChromaLoad
+from cpx400dp import CPX400DP
+from keithleyDMM6500 import DMM6500
+from simulators import ChromaLoadSimulator, CPX400DPSimulator, DMM6500Simulator
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = PollScheduler(max_workers=4, max_backoff=0.4, breaker_threshold=3)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def test_readings_are_published_and_none_skips_a_cycle(scheduler):
+    calls = []
+    job = scheduler.add("dmm", lambda: calls.append(1) or (None if len(calls) % 2 else len(calls)), 0.01)
+    wait_for(lambda: len(calls) >= 6)
+    job.stop()
+    values = [values for _, values, error in job.drain()]
+    assert values and all(value % 2 == 0 for value in values)
+
+
+def test_failures_back_off_then_open_the_breaker(scheduler):
+    calls = []
+    healthy = threading.Event()
+
+    def read():
+        calls.append(time.monotonic())
+        if not healthy.is_set():
+            raise OSError("unreachable")
+        return "ok"
+
+    job = scheduler.add("psu", read, 0.02)
+    wait_for(lambda: job.state == "open")
+    assert len(calls) == 3
+    gaps = [b - a for a, b in zip(calls, calls[1:])]
+    assert gaps[0] == pytest.approx(0.04, abs=0.02)  # interval * 2
+    assert gaps[1] == pytest.approx(0.08, abs=0.02)  # interval * 4
+    time.sleep(0.2)
+    assert len(calls) == 3  # open: next probe only after max_backoff
+    healthy.set()
+    wait_for(lambda: job.state == "ok", timeout=1.0)
+    assert job.failures == 0
+    assert time.monotonic() - calls[2] >= 0.38
+    errors = [error for _, _, error in job.drain() if error is not None]
+    assert len(errors) == 3
+
+
+def test_active_and_idle_intervals(scheduler):
+    active = threading.Event()
+    calls = []
+    scheduler.add("load", lambda: calls.append(1), 0.01, 0.2, active.is_set)
+    time.sleep(0.5)
+    idle_calls = len(calls)
+    active.set()
+    time.sleep(0.5)
+    assert idle_calls <= 4
+    assert len(calls) - idle_calls >= 15
+
+
+def test_slow_instrument_only_delays_itself(scheduler):
+    fast = []
+    scheduler.add("slow", lambda: time.sleep(0.5), 0.01)
+    scheduler.add("fast", lambda: fast.append(1), 0.01)
+    time.sleep(0.3)
+    assert len(fast) >= 10
+
+
+def test_io_budget_caps_reads_per_second():
+    scheduler = PollScheduler(max_workers=4, io_budget=20)
+    calls = []
+    for n in range(5):
+        scheduler.add(f"psu{n}", lambda: calls.append(time.monotonic()), 0.01)
+    time.sleep(1.0)  # the full bucket (one second of budget) is spent in a burst
+    steady = len(calls)
+    time.sleep(1.0)
+    scheduler.shutdown()
+    assert 15 <= len(calls) - steady <= 25
+
+
+def read_psu(sim):
+    psu = CPX400DP(*sim.address, timeout=0.5)
+    psu.connect()
+    return psu.disconnect, lambda: (psu.cache.clear(), psu.read_all())
+
+
+def read_dmm(sim):
+    dmm = DMM6500(*sim.address, timeout=0.5)
+    return dmm.close, lambda: dmm.query("MEAS:VOLT:DC?")
+
+
+def read_load(sim):
+    load = ChromaLoad(*sim.address, timeout=0.5, max_retries=0)
+    return load.disconnect, lambda: load.send_command("*IDN?")
+
+
+@pytest.mark.parametrize("simulator, driver", [
+    (CPX400DPSimulator, read_psu),
+    (DMM6500Simulator, read_dmm),
+    (ChromaLoadSimulator, read_load),
+])
+def test_job_recovers_when_the_instrument_comes_back(scheduler, simulator, driver):
+    sim = simulator(port=0).start()
+    port = sim.address[1]
+    close, read = driver(sim)
+    job = scheduler.add("instrument", read, 0.02)
+    wait_for(lambda: job.latest() is not None)
+    sim.stop()
+    wait_for(lambda: job.state == "open")
+    sim = simulator(port=port).start()
+    try:
+        wait_for(lambda: job.state == "ok", timeout=2.0)
+    finally:
+        job.stop()
+        close()
+        sim.stop()
@@ -0,0 +1,95 @@
+import pytest
+
+from render import RenderScheduler
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append((ms, callback))
+
+
+class FakeWidget:
+    def __init__(self):
+        self.configs = []
+
+    def config(self, **options):
+        self.configs.append(options)
+
+
+class FakeVar:
+    def __init__(self, name):
+        self.name = name
+        self.values = []
+
+    def set(self, value):
+        self.values.append(value)
+
+    def __str__(self):
+        return self.name
+
+
+@pytest.fixture
+def render():
+    return RenderScheduler(FakeRoot(), fps=10)
+
+
+def test_unchanged_text_is_not_configured_again(render):
+    label = FakeWidget()
+    render.set_text(label, "5.000 V")
+    render.set_text(label, "5.000 V")
+    render.set_text(label, "5.000 V", fg="red")
+    render.set_text(label, "5.001 V", fg="red")
+    assert label.configs == [{"text": "5.000 V"}, {"text": "5.000 V", "fg": "red"}, {"text": "5.001 V", "fg": "red"}]
+    assert render.updates == 3
+
+
+def test_variables_are_diffed_by_name(render):
+    var = FakeVar("PY_VAR1")
+    for value in (True, True, False, False, True):
+        render.set_var(var, value)
+    assert var.values == [True, False, True]
+    assert render.updates == 3
+
+
+def test_every_source_runs_once_per_frame(render):
+    calls = []
+    render.add(lambda: calls.append("a"))
+    render.add(lambda: calls.append("b"))
+    render.tick()
+    render.tick()
+    assert calls == ["a", "b", "a", "b"]
+    assert len(render.frame_times) == 2
+
+
+def test_removed_sources_stop_running(render):
+    calls = []
+
+    def once():
+        calls.append("once")
+        render.remove(once)  # e.g. check_connections, done after one result
+    render.add(once)
+    render.add(lambda: calls.append("always"))
+    render.tick()
+    render.tick()
+    render.remove(once)  # already gone: no error
+    assert calls == ["once", "always", "always"]
+
+
+def test_a_failing_source_does_not_stop_the_frame(render, capsys):
+    calls = []
+    render.add(lambda: 1 / 0)
+    render.add(lambda: calls.append(1))
+    render.tick()
+    assert calls == [1]
+    assert "Render error" in capsys.readouterr().out
+
+
+def test_next_frame_is_scheduled_at_the_frame_rate(render):
+    render.root.scheduled.clear()
+    render.tick()
+    (ms, callback), = render.root.scheduled
+    assert callback == render.tick
+    assert 1 <= ms <= 100
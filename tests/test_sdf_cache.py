@@ -0,0 +1,55 @@
+import pytest
+
+from conftest import FakeSdfRead
+
+
+@pytest.fixture
+def sdf_files(tmp_path, monkeypatch, serial_connection):
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path / "cache"))
+    first, second = tmp_path / "a.sdf", tmp_path / "b.sdf"
+    first.write_text("o_control_state 0x10 u8\nElecHeater_manual_request 0x11 u8\n")
+    second.write_text("o_control_state 0x20 u8\nPump_dhw_manual_request 0x21 u8\n")
+    return first, second
+
+
+def test_given_sdf_path_is_used_and_cached(serial_connection, sdf_files):
+    _, second = sdf_files
+    provider = serial_connection.ComplexSdfProvider(sdf_path=second)
+    assert provider.sdf_path == second
+    assert provider.variables["Pump_dhw_manual_request"] == (0x21, "u8")
+    assert serial_connection.load_sdf_snapshot(serial_connection.sdf_digest(second)) is not None
+    cached = serial_connection.ComplexSdfProvider(sdf_path=second)
+    assert cached.sdf_path == second
+    assert cached.variables == provider.variables
+    assert FakeSdfRead.parses == 1
+
+
+def test_communication_is_reattached_from_the_cache(serial_connection, sdf_files):
+    first, _ = sdf_files
+    serial_connection.ComplexSdfProvider(communication=object(), sdf_path=first)
+    link = object()
+    assert serial_connection.ComplexSdfProvider(communication=link, sdf_path=first).communication is link
+    assert FakeSdfRead.parses == 1
+
+
+def test_folder_picks_its_first_sdf(serial_connection, sdf_files):
+    first, _ = sdf_files
+    assert serial_connection.ComplexSdfProvider(sdf_path=first.parent).sdf_path == first
+
+
+def test_another_parser_version_misses_the_cache(serial_connection, sdf_files, monkeypatch):
+    first, _ = sdf_files
+    digest = serial_connection.sdf_digest(first)
+    monkeypatch.setattr(serial_connection, "parser_fingerprint", lambda: b"another release")
+    assert serial_connection.sdf_digest(first) != digest
+
+
+def test_unreadable_snapshot_is_a_miss(serial_connection, sdf_files):
+    first, _ = sdf_files
+    serial_connection.ComplexSdfProvider(sdf_path=first)
+    digest = serial_connection.sdf_digest(first)
+    path = serial_connection.get_sdf_cache_path() / f"{digest}.pickle"
+    path.write_bytes(b"\x80\x05not a pickle")
+    assert serial_connection.load_sdf_snapshot(digest) is None
+    assert serial_connection.ComplexSdfProvider(sdf_path=first).sdf_path == first
+    assert FakeSdfRead.parses == 2
@@ -0,0 +1,119 @@
+import time
+
+import pytest
+
+from chroma_load import ChromaLoad, same_setting
+from cpx400dp import CPX400DP
+
+
+def record(sim):
+    messages = []
+    handle = sim.handle
+    sim.handle = lambda message: messages.append(message) or handle(message)
+    return messages
+
+
+@pytest.mark.parametrize("a, b, same", [
+    ("ON", "1", True),
+    ("off", "0", True),
+    ("1.50", "1.5", True),
+    ("CCH", "cch", True),
+    ("CCH", "CCL", False),
+    ("2", "2.001", False),
+])
+def test_same_setting(a, b, same):
+    assert same_setting(a, b) is same
+
+
+@pytest.fixture
+def psu(psu_sim):
+    psu = CPX400DP(*psu_sim.address, coalesce_window=10.0)
+    psu.connect()
+    yield psu
+    psu.disconnect()
+
+
+def test_psu_writes_only_the_final_changed_value(psu, psu_sim):
+    sent = record(psu_sim)
+    psu.set_voltage(1, 5)
+    psu.set_voltage(1, 6)
+    psu.set_voltage(1, 7)
+    psu.set_current(1, 0)  # already the confirmed value
+    psu.flush()
+    psu.set_voltage(1, 7)
+    psu.flush()
+    psu.query_many(["*IDN?"])
+    assert sent == ["V1 7.000", "*IDN?"]
+
+
+def test_psu_output_off_is_immediate(psu, psu_sim):
+    psu.output_on(1)
+    psu.flush()
+    psu.query_many(["*IDN?"])  # the writes above have been handled once this answers
+    assert psu_sim.output[1]
+    psu.output_on(2)  # queued behind the 10 s coalescing window
+    psu.output_off(2)
+    psu.output_off(1)
+    psu.query_many(["*IDN?"])
+    assert not psu_sim.output[1]
+    assert not psu_sim.output[2]
+    assert psu.pending_writes == {}
+
+
+def test_psu_output_off_ignores_a_stale_shadow(psu, psu_sim):
+    assert psu.setpoints["OP1"] == "0"
+    psu_sim.output[1] = True  # switched on from the front panel
+    psu.output_off(1)
+    psu.query_many(["*IDN?"])
+    assert not psu_sim.output[1]
+
+
+def test_psu_output_off_failure_reaches_the_caller(psu):
+    psu.socket.close()
+    with pytest.raises(OSError):
+        psu.output_off(1)
+    assert "OP1" not in psu.setpoints  # unknown now, so the next write is never skipped
+    psu.socket = None
+
+
+@pytest.fixture
+def load(load_sim):
+    load = ChromaLoad(*load_sim.address)
+    load.select_channel(3)
+    load.send_command("*OPC?")  # CHAN 3 handled before a test starts recording
+    yield load
+    load.disconnect()
+
+
+def test_load_skips_set_points_it_already_holds(load, load_sim):
+    sent = record(load_sim)
+    load.apply_commands(["MODE CCH", "CURR:STAT:L1 1.5"])
+    load.apply_commands(["MODE CCH", "CURR:STAT:L1 1.50"])
+    load.set_point("MODE CCH")
+    assert sent == ["MODE CCH;:CURR:STAT:L1 1.5;:*OPC?"]
+
+
+def test_load_on_is_resent_after_the_load_switched_itself_off(load, load_sim):
+    load.load_on()
+    assert load.check_load_status()
+    load_sim.settings[3]["LOAD:STAT"] = "0"  # protection trip or front panel
+    time.sleep(0.6)  # let the cached LOAD:STATe? reply expire
+    assert not load.check_load_status()
+    load.load_on()
+    load.send_command("*OPC?")
+    assert load_sim.settings[3]["LOAD:STAT"] == "1"
+
+
+def test_profile_load_on_is_never_skipped(load, load_sim):
+    load.apply_commands(["MODE CCH", "LOAD:STATe ON"])
+    load_sim.settings[3]["LOAD:STAT"] = "0"
+    load.apply_commands(["MODE CCH", "LOAD:STATe ON"])
+    assert load_sim.settings[3]["LOAD:STAT"] == "1"
+
+
+def test_load_off_is_always_sent(load, load_sim):
+    sent = record(load_sim)
+    load.load_off()
+    load.load_off()
+    load.query("*IDN?")
+    assert sent == ["LOAD:STATe OFF", "LOAD:STATe OFF", "*IDN?"]
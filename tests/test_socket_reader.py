@@ -0,0 +1,81 @@
+import socket
+import time
+
+import pytest
+
+from cpx400dp import CPX400DP
+from keithleyDMM6500 import DMM6500
+from socket_reader import SocketReader
+
+
+@pytest.fixture
+def pair():
+    a, b = socket.socketpair()
+    a.settimeout(0.2)
+    yield a, b
+    a.close()
+    b.close()
+
+
+def test_reply_split_over_packets(pair):
+    a, b = pair
+    reader = SocketReader(a)
+    b.sendall(b"V1 12.")
+    b.sendall(b"000\n")
+    assert reader.read_line() == "V1 12.000"
+
+
+def test_several_replies_in_one_packet(pair):
+    a, b = pair
+    reader = SocketReader(a)
+    b.sendall(b"12.000V\n0.500A\n#14abcd\n")
+    assert reader.read_line() == "12.000V"
+    assert reader.read_line() == "0.500A"
+    assert reader.read_exact(2) == b"#1"
+    assert reader.read_exact(1) == b"4"
+    assert reader.read_exact(4) == b"abcd"
+    assert reader.read_line() == ""
+
+
+def test_timeout_desynchronizes_the_stream(pair):
+    a, b = pair
+    reader = SocketReader(a)
+    b.sendall(b"partial")
+    with pytest.raises(TimeoutError):
+        reader.read_line()
+    b.sendall(b" reply\n")
+    with pytest.raises(ConnectionError):
+        reader.read_line()
+
+
+def test_closed_connection(pair):
+    a, b = pair
+    reader = SocketReader(a)
+    b.close()
+    with pytest.raises(ConnectionError):
+        reader.read_line()
+
+
+def test_psu_late_reply_is_not_taken_for_the_next_answer(psu_sim):
+    psu = CPX400DP(*psu_sim.address, timeout=0.2)
+    psu.connect()
+    psu.set_current(1, 1.5)
+    psu.flush()
+    psu_sim.latency = 0.4
+    with pytest.raises(TimeoutError):
+        psu.send_command("V1?", expect_response=True)
+    psu_sim.latency = 0.0
+    time.sleep(0.4)  # the V1 reply arrives on the old connection
+    assert psu.send_command("I1?", expect_response=True) == "I1 1.500"
+    psu.disconnect()
+
+
+def test_dmm_reconnects_after_a_timeout(dmm_sim):
+    dmm = DMM6500(*dmm_sim.address, timeout=0.2)
+    dmm_sim.latency = 0.4
+    with pytest.raises(TimeoutError):
+        dmm.query("*IDN?")
+    dmm_sim.latency = 0.0
+    time.sleep(0.4)
+    assert float(dmm.query("MEAS:CURR:DC?")) == pytest.approx(0.5, abs=1e-3)
+    dmm.close()
@@ -0,0 +1,50 @@
+import pytest
+
+
+class SingleNameInterface:
+    # read_value only accepts one name per call.
+    def __init__(self, values):
+        self.values = values
+        self.calls = []
+
+    def read_value(self, names):
+        self.calls.append(list(names))
+        if len(names) != 1:
+            raise TypeError("one name at a time")
+        return [self.values[names[0]]]
+
+
+class BatchInterface(SingleNameInterface):
+    def read_value(self, names):
+        self.calls.append(list(names))
+        return [self.values[name] for name in names]
+
+
+@pytest.fixture
+def controller(serial_connection):
+    def make(interface):
+        stk = serial_connection.Stk500Controller("COM1", serial_connection.ComplexSdfProvider)
+        stk.interface = interface
+        return stk
+    return make
+
+
+def test_batch_read(controller):
+    interface = BatchInterface({"a": 1, "b": 2})
+    assert controller(interface).read_values(["a", "b"]) == {"a": 1, "b": 2}
+    assert interface.calls == [["a", "b"]]
+
+
+def test_falls_back_to_single_reads(controller):
+    interface = SingleNameInterface({"a": 1, "b": 2})
+    stk = controller(interface)
+    assert stk.read_values(["a", "b"]) == {"a": 1, "b": 2}
+    assert stk.read_values(["a", "b"]) == {"a": 1, "b": 2}
+    assert interface.calls == [["a", "b"], ["a"], ["b"], ["a"], ["b"]]
+
+
+def test_manual_controls_write_in_one_transaction(serial_connection):
+    stk = serial_connection.Stk500Controller("COM1", serial_connection.ComplexSdfProvider)
+    stk.write_values({serial_connection.MANUAL_MODE: 1, serial_connection.HEATER: 1})
+    assert stk.read_values([serial_connection.MANUAL_MODE, serial_connection.HEATER]) == {
+        serial_connection.MANUAL_MODE: 1, serial_connection.HEATER: 1}
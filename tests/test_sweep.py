@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from cpx400dp import CPX400DP
+from keithleyDMM6500 import DMM6500
+from sweep import SweepEngine
+
+
+@pytest.fixture
+def psu(psu_sim):
+    psu = CPX400DP(*psu_sim.address, coalesce_window=0)
+    psu.connect()
+    psu.set_current(1, 1.0)
+    yield psu
+    psu.disconnect()
+
+
+def test_points_settle_on_the_set_point(psu, dmm_sim):
+    psu.output_on(1)
+    dmm = DMM6500(*dmm_sim.address)
+    result = SweepEngine(psu, dmm, settle_timeout=0.5).run([1], [1.0, 2.5, 5.0])
+    dmm.close()
+    assert result["settled"].all()
+    assert np.allclose(result["psu_voltage"][:, 0], [1.0, 2.5, 5.0])
+    assert np.allclose(result["dmm_mean"], 5.0, atol=0.02)
+
+
+def test_sweep_restores_the_dmm_settings(psu, dmm_sim):
+    dmm = DMM6500(*dmm_sim.address)
+    dmm.send_command('SENS:FUNC "CURR:DC"')
+    dmm.send_command('TRAC:POIN 500, "defbuffer1"')
+    dmm.query("*OPC?")
+    received = []
+    handle = dmm_sim.handle
+    dmm_sim.handle = lambda message: received.append(message) or handle(message)
+    SweepEngine(psu, dmm, dmm_samples=20, settle_timeout=0.1).run([1], [1.0])
+    dmm.query("*OPC?")
+    # "0" is the simulator's answer to VOLT:DC:NPLC?; the function goes back last.
+    assert received[-5:-1] == ["VOLT:DC:NPLC 0", "SENS:COUN 1", 'TRAC:POIN 500, "defbuffer1"', 'SENS:FUNC "CURR:DC"']
+    assert dmm.query("SENS:FUNC?") == '"CURR:DC"'
+    dmm.close()
+
+
+def test_output_off_never_settles(psu):
+    result = SweepEngine(psu, settle_timeout=0.1).run([1], [1.0, 2.0])
+    assert not result["settled"].any()
+    assert (result["settle_time"] > 0.1).all()
+
+
+def test_current_limit_is_not_a_settled_point(psu):
+    psu.output_on(1)
+    # 10 ohm load and a 1 A limit: 15 V cannot be reached.
+    result = SweepEngine(psu, settle_timeout=0.1).run([1], [5.0, 15.0])
+    assert result["settled"].tolist() == [True, False]
+    assert result["psu_voltage"][1, 0] == pytest.approx(10.0)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from timeseries import RingBuffer, TimeSeriesStore
+
+
+def test_append_wraps_around():
+    ring = RingBuffer(5)
+    for n in range(8):
+        ring.append(n, n * 10)
+    times, values = ring.window()
+    assert times.tolist() == [3, 4, 5, 6, 7]
+    assert values.tolist() == [30, 40, 50, 60, 70]
+    assert ring.latest() == (7, 70)
+
+
+def test_extend_across_the_end_and_longer_than_capacity():
+    ring = RingBuffer(5)
+    ring.extend([0, 1, 2], [0, 1, 2])
+    ring.extend([3, 4, 5, 6], [3, 4, 5, 6])
+    assert ring.window()[0].tolist() == [2, 3, 4, 5, 6]
+    ring.extend(np.arange(10, 22), np.arange(10, 22))
+    assert ring.window()[0].tolist() == [17, 18, 19, 20, 21]
+
+
+def test_window_of_the_last_seconds():
+    ring = RingBuffer(4)
+    for n in range(6):
+        ring.append(100 + n, n)
+    assert ring.window(seconds=2, now=105)[1].tolist() == [3, 4, 5]
+    assert RingBuffer(3).window(seconds=1)[0].size == 0
+    assert RingBuffer(3).latest() is None
+
+
+def test_store_stats():
+    store = TimeSeriesStore(capacity=100)
+    for n in range(1, 11):
+        store.record("PSU", 1, "voltage", n, timestamp=n)
+    stats = store.stats("PSU", 1, "voltage")
+    assert stats["count"] == 10
+    assert (stats["min"], stats["max"], stats["mean"]) == (1, 10, 5.5)
+    assert store.stats("PSU", 2, "voltage") is None
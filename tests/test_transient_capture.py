@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from chroma_load import ChromaLoad
+from keithleyDMM6500 import DMM6500
+from transient_capture import TransientCapture, analyze_step
+
+RATE = 1e6
+TRIGGER = 1000
+
+
+def first_order(delay=0, tau=50e-6, n=5000, initial=5.0, final=4.5):
+    t = np.arange(n) / RATE
+    start = (TRIGGER + delay) / RATE
+    v = np.full(n, initial)
+    after = t >= start
+    v[after] = final + (initial - final) * np.exp(-(t[after] - start) / tau)
+    return t, v
+
+
+def test_first_order_step():
+    tau = 50e-6
+    t, v = first_order(tau=tau)
+    m = analyze_step(t, v, TRIGGER)
+    assert m["initial"] == pytest.approx(5.0)
+    assert m["final"] == pytest.approx(4.5, abs=1e-6)
+    assert m["step"] == pytest.approx(-0.5, abs=1e-6)
+    assert m["overshoot_pct"] == pytest.approx(0.0, abs=1e-6)
+    assert m["rise_time"] == pytest.approx(tau * np.log(9), abs=2e-6)
+    # Measured from the 10 % edge: ln(50) - ln(1 / 0.9) time constants.
+    assert m["settle_time"] == pytest.approx(tau * (np.log(50) - np.log(1 / 0.9)), abs=2e-6)
+
+
+def test_delay_before_the_step_is_not_settling():
+    tau = 50e-6
+    _, plain = first_order(tau=tau)
+    t, delayed = first_order(delay=300, tau=tau)
+    m, m_delayed = analyze_step(t, plain, TRIGGER), analyze_step(t, delayed, TRIGGER)
+    assert m_delayed["settle_time"] == pytest.approx(m["settle_time"], abs=2e-6)
+    assert m_delayed["edge_time"] - m["edge_time"] == pytest.approx(300 / RATE, abs=2e-6)
+
+
+def test_underdamped_overshoot():
+    zeta, wn = 0.5, 2 * np.pi * 5e3
+    t = np.arange(20000) / RATE
+    wd = wn * np.sqrt(1 - zeta ** 2)
+    s = np.clip(t - TRIGGER / RATE, 0, None)
+    unit = 1 - np.exp(-zeta * wn * s) * (np.cos(wd * s) + zeta / np.sqrt(1 - zeta ** 2) * np.sin(wd * s))
+    m = analyze_step(t, 2.0 + unit, TRIGGER)
+    assert m["overshoot_pct"] == pytest.approx(100 * np.exp(-np.pi * zeta / np.sqrt(1 - zeta ** 2)), abs=0.2)
+    assert m["peak"] == pytest.approx(2.0 + 1 + m["overshoot_pct"] / 100, abs=1e-3)
+
+
+def test_flat_signal():
+    t = np.arange(2000) / RATE
+    m = analyze_step(t, np.full(2000, 5.0), TRIGGER)
+    assert m["settle_time"] == 0.0
+    assert np.isnan(m["rise_time"])
+
+
+def test_capture_finds_the_step_and_restores_the_dmm(dmm_sim, load_sim):
+    dmm_sim.step_delay = 0.005
+    dmm, load = DMM6500(*dmm_sim.address), ChromaLoad(*load_sim.address)
+    before = (dmm.query("SENS:FUNC?"), dmm.query('TRAC:POIN? "defbuffer1"'))
+    times, values, m = TransientCapture(dmm, load, sample_rate=100000, samples=5000).run()
+    assert len(values) == 5000
+    assert m["edge_time"] == pytest.approx(0.005, abs=2e-5)
+    assert m["step"] == pytest.approx(-0.5, abs=0.02)
+    assert (dmm.query("SENS:FUNC?"), dmm.query('TRAC:POIN? "defbuffer1"')) == before
+    assert load.check_load_status()
+    dmm.close()
+    load.disconnect()
@@ -0,0 +1,102 @@
+import threading
+import time
+import numpy as np
+
+
+class RingBuffer:
+    # Preallocated (timestamp, value) ring: appends are O(1) and memory never grows.
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.values = np.zeros(capacity)
+        self.index = 0  # next slot to write
+        self.count = 0
+
+    def append(self, timestamp: float, value: float):
+        self.times[self.index] = timestamp
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def extend(self, timestamps, values):
+        timestamps = np.asarray(timestamps, dtype=float)[-self.capacity:]
+        values = np.asarray(values, dtype=float)[-self.capacity:]
+        slots = (self.index + np.arange(len(values))) % self.capacity
+        self.times[slots] = timestamps
+        self.values[slots] = values
+        self.index = (self.index + len(values)) % self.capacity
+        self.count = min(self.count + len(values), self.capacity)
+
+    def _segments(self):
+        # The filled part as at most two chronologically ordered slices.
+        if self.count < self.capacity:
+            return [slice(0, self.count)]
+        return [slice(self.index, self.capacity), slice(0, self.index)]
+
+    def window(self, seconds=None, now=None):
+        # Samples from the last `seconds` (all samples when None), oldest first.
+        start = None if seconds is None else (now if now is not None else time.time()) - seconds
+        times, values = [], []
+        for part in self._segments():
+            t = self.times[part]
+            first = 0 if start is None else np.searchsorted(t, start)
+            times.append(t[first:])
+            values.append(self.values[part][first:])
+        if not times:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(times), np.concatenate(values)
+
+    def latest(self):
+        if self.count == 0:
+            return None
+        last = (self.index - 1) % self.capacity
+        return self.times[last], self.values[last]
+
+
+class TimeSeriesStore:
+    # One RingBuffer per (instrument, channel, quantity), e.g. ("PSU Left", 1, "voltage").
+    def __init__(self, capacity: int = 200000):
+        self.capacity = capacity
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def _buffer(self, key):
+        buffer = self.series.get(key)
+        if buffer is None:
+            buffer = self.series[key] = RingBuffer(self.capacity)
+        return buffer
+
+    def record(self, instrument, channel, quantity, value, timestamp=None):
+        with self.lock:
+            self._buffer((instrument, channel, quantity)).append(
+                time.time() if timestamp is None else timestamp, float(value))
+
+    def record_block(self, instrument, channel, quantity, timestamps, values):
+        with self.lock:
+            self._buffer((instrument, channel, quantity)).extend(timestamps, values)
+
+    def keys(self):
+        with self.lock:
+            return list(self.series)
+
+    def window(self, instrument, channel, quantity, seconds=None):
+        with self.lock:
+            buffer = self.series.get((instrument, channel, quantity))
+            if buffer is None:
+                return np.empty(0), np.empty(0)
+            times, values = buffer.window(seconds)
+        return times, values
+
+    def stats(self, instrument, channel, quantity, seconds=None, percentiles=(50, 99)):
+        _, values = self.window(instrument, channel, quantity, seconds)
+        if len(values) == 0:
+            return None
+        result = {
+            "count": len(values),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+        }
+        for p, value in zip(percentiles, np.percentile(values, percentiles)):
+            result[f"p{p}"] = float(value)
+        return result
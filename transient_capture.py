@@ -0,0 +1,129 @@
+import time
+import numpy as np
+from dmm_acquisition import read_buffer, restore_settings, save_settings
+
+# Digitize ranges used when none is given (digitize functions have no autorange).
+DEFAULT_RANGES = {"VOLT": 10, "CURR": 3}
+
+def analyze_step(times, values, trigger_index, settle_band=0.02, edge_fraction=0.1):
+    # Step response metrics, computed without Python loops. The samples before
+    # trigger_index are the initial level; the step itself is found in the samples (the
+    # first one edge_fraction of the step away from that level), so the delay between
+    # the trigger and the load actually switching is reported as edge_time instead of
+    # being counted as settling. Rise time is 10 % to 90 % of the step.
+    pre = values[:trigger_index] if trigger_index > 0 else values[:1]
+    initial = pre.mean()
+    final = values[trigger_index:][-max(1, (len(values) - trigger_index) // 10):].mean()
+    step = final - initial
+
+    threshold = max(edge_fraction * abs(step), 5 * pre.std())
+    moved = np.flatnonzero(np.abs(values[trigger_index:] - initial) > threshold)
+    edge = trigger_index + (int(moved[0]) if len(moved) else 0)
+    t = times[edge:] - times[edge]
+    post = values[edge:]
+
+    peak = post[np.argmax(np.abs(post - initial))]
+    beyond = (post - final) * (1 if step >= 0 else -1)
+    overshoot = max(0.0, beyond.max()) / abs(step) * 100 if step else 0.0
+
+    rise_time = float("nan")
+    if step:
+        progress = (post - initial) / step
+        low, high = np.flatnonzero(progress >= 0.1), np.flatnonzero(progress >= 0.9)
+        if len(low) and len(high):
+            rise_time = float(t[high[0]] - t[low[0]])
+
+    band = settle_band * abs(step) if step else settle_band * max(abs(final), 1e-12)
+    outside = np.flatnonzero(np.abs(post - final) > band)
+    if len(outside) == 0:
+        settle_time = 0.0
+    elif outside[-1] + 1 < len(t):
+        settle_time = float(t[outside[-1] + 1])
+    else:
+        settle_time = float("nan")  # never settled inside the capture window
+
+    return {
+        "initial": float(initial),
+        "final": float(final),
+        "step": float(step),
+        "peak": float(peak),
+        "overshoot_pct": float(overshoot),
+        "edge_time": float(times[edge] - times[trigger_index]) if trigger_index < len(times) else 0.0,
+        "rise_time": rise_time,
+        "settle_time": settle_time,
+    }
+
+
+class TransientCapture:
+    # Arms the DMM6500 digitizer with pre-trigger samples, fires the load step and
+    # pulls the waveform back in bulk. The DMM's function, digitize settings and buffer
+    # size are put back afterwards.
+    def __init__(self, dmm, chroma, function="VOLT", sample_rate=1000000, samples=100000,
+                 pre_trigger=0.2, measure_range=None, buffer="defbuffer1"):
+        if function not in DEFAULT_RANGES:
+            raise ValueError(f"Unsupported digitize function '{function}'.")
+        self.dmm = dmm
+        self.chroma = chroma
+        self.function = function
+        self.sample_rate = sample_rate
+        self.samples = samples
+        self.pre_trigger = pre_trigger
+        self.measure_range = measure_range or DEFAULT_RANGES[function]
+        self.buffer = buffer
+
+    def arm(self):
+        f = self.function
+        post_percent = round((1 - self.pre_trigger) * 100)
+        for command in [
+            f'DIG:FUNC "{f}"',
+            f"DIG:{f}:RANG {self.measure_range}",
+            f"DIG:{f}:SRAT {self.sample_rate}",
+            f"DIG:{f}:APER AUTO",
+            "DIG:COUN 1",
+            f'TRAC:POIN {self.samples}, "{self.buffer}"',
+            # Measure continuously until the command event, then fill the rest of the buffer.
+            f'TRIG:LOAD "LoopUntilEvent", COMM, {post_percent}, ON, 0, "{self.buffer}"',
+            "INIT",
+        ]:
+            self.dmm.send_command(command)
+
+    def wait_idle(self, timeout):
+        deadline = time.monotonic() + timeout
+        while not self.dmm.query("TRIG:STAT?").startswith("IDLE"):
+            if time.monotonic() > deadline:
+                self.dmm.send_command("ABOR")
+                raise TimeoutError("Digitize capture did not complete.")
+            time.sleep(0.01)
+
+    def fetch(self, chunk=50000):
+        count = int(float(self.dmm.query(f'TRAC:ACT? "{self.buffer}"')))
+        times, values = [], []
+        for start in range(1, count + 1, chunk):
+            t, v = read_buffer(self.dmm, start, min(start + chunk - 1, count), self.buffer)
+            times.append(t)
+            values.append(v)
+        if not values:
+            raise RuntimeError("Digitize capture returned no samples.")
+        return np.concatenate(times), np.concatenate(values)
+
+    def run(self, action=None, settle_band=0.02, timeout=10.0):
+        # action defaults to switching the load on; returns (times, values, metrics).
+        action = action or self.chroma.load_on
+        f = self.function
+        saved = save_settings(self.dmm, [f"DIG:{f}:RANG", f"DIG:{f}:SRAT", f"DIG:{f}:APER", "DIG:COUN",
+                                         "TRAC:POIN", "FUNC"], self.buffer)
+        try:
+            self.arm()
+            # Give the digitizer time to fill the pre-trigger part of the buffer.
+            time.sleep(self.samples * self.pre_trigger / self.sample_rate + 0.05)
+            self.dmm.send_command("*TRG")
+            action()
+            self.wait_idle(timeout)
+            times, values = self.fetch()
+        finally:
+            self.dmm.send_command("ABOR")
+            self.dmm.send_command('TRIG:LOAD "Empty"')
+            restore_settings(self.dmm, saved)
+        # Where *TRG was sent; analyze_step finds the load step after it.
+        trigger_index = max(0, len(values) - round(self.samples * (1 - self.pre_trigger)))
+        return times, values, analyze_step(times, values, trigger_index, settle_band)